@@ -26,7 +26,7 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
@@ -41,94 +41,106 @@ if not ADDRESS or not FACILITATOR_URL:
 
 # Try to import real x402 helpers; if unavailable, provide lightweight stubs so the demo runs.
 try:
-    from x402.fastapi.middleware import require_payment
+    from x402.fastapi.middleware import PaymentMatcher
     from x402.facilitator import FacilitatorConfig
     from x402.types import EIP712Domain, TokenAmount, TokenAsset
     REAL_X402 = True
 except Exception:
     REAL_X402 = False
 
-    @dataclass
+    @dataclass(slots=True, frozen=True)
     class FacilitatorConfig:
         url: str
 
-    @dataclass
+    @dataclass(slots=True, frozen=True)
     class EIP712Domain:
         name: str
         version: Optional[str] = None
 
-    @dataclass
+    @dataclass(slots=True, frozen=True)
     class TokenAsset:
         address: str
         decimals: int = 18
         eip712: Optional[EIP712Domain] = None
 
-    @dataclass
+    @dataclass(slots=True, frozen=True)
     class TokenAmount:
         amount: str
         asset: TokenAsset
 
-    def _match_path(request_path: str, pattern: str) -> bool:
-        # support patterns like '/premium/*' or exact '/weather'
-        if pattern.endswith("/*"):
-            return request_path.startswith(pattern[:-1])
-        return request_path == pattern
+    class PaymentMatcher:
+        """Stand-in for `x402.fastapi.middleware.PaymentMatcher`: one middleware for every paid route.
 
-    def require_payment(path: str, price: Any, pay_to_address: str, network: str, facilitator_config: FacilitatorConfig):
+        Routes are tried in registration order, like the real matcher; `/prefix/*` patterns match any
+        path under the prefix. Each route stores only its payment check, so a request's path is matched once. Requests
+        with `X-MOCK-PAYED: true` are let through; anything else gets a 402-like JSON response.
         """
-        Returns a middleware function for FastAPI that enforces a (stubbed) payment check.
 
-        In this demo stub, the middleware logs that payment would be required. If the request
-        includes a header `X-MOCK-PAYED: true` then the middleware allows the request; otherwise it
-        returns a 402-like JSON response indicating payment required.
-        """
-
-        async def middleware(request: Request, call_next):
-            # Only enforce for matching paths
-            if _match_path(request.url.path, path):
+        def __init__(self) -> None:
+            # (path or prefix, is_prefix, payment check), in registration order
+            self._routes: List[Tuple[str, bool, Callable]] = []
+
+        def add(self, path: str, price: Any, pay_to_address: str, network: str, facilitator_config: FacilitatorConfig) -> "PaymentMatcher":
+            enforce = self._enforcer(price, pay_to_address, network, facilitator_config)
+            if path.endswith("/*"):
+                self._routes.append((path[:-1], True, enforce))
+            else:
+                self._routes.append((path, False, enforce))
+            return self
+
+        @staticmethod
+        def _enforcer(price: Any, pay_to_address: str, network: str, facilitator_config: FacilitatorConfig) -> Callable:
+            import json
+
+            from fastapi.responses import Response
+
+            # the 402 body never changes per route, so build and encode it once here
+            payment_required_body = json.dumps({
+                "error": "payment_required",
+                "message": "This endpoint requires payment. In the real integration the x402 facilitator would verify and settle.",
+                "required_price": str(price),
+                "pay_to": pay_to_address,
+                "network": network,
+                "facilitator": facilitator_config.url,
+            }, separators=(",", ":")).encode("utf-8")
+
+            async def enforce(request: Request, call_next):
                 # Simple mock behavior: allow if client sets X-MOCK-PAYED: true header
                 paid_header = request.headers.get("x-mock-payed", "false").lower()
                 if paid_header in ("1", "true", "yes"):
-                    # proceed to handler
                     return await call_next(request)
-                # return a payment-required response (JSON)
-                from fastapi.responses import JSONResponse
-
-                return JSONResponse(
-                    status_code=402,
-                    content={
-                        "error": "payment_required",
-                        "message": "This endpoint requires payment. In the real integration the x402 facilitator would verify and settle.",
-                        "required_price": str(price),
-                        "pay_to": pay_to_address,
-                        "network": network,
-                        "facilitator": facilitator_config.url,
-                    },
-                )
-            return await call_next(request)
-
-        return middleware
+                return Response(content=payment_required_body, status_code=402, media_type="application/json")
+
+            return enforce
+
+        async def middleware(self, request: Request, call_next):
+            request_path = request.scope["path"]
+            enforce = next(
+                (
+                    check
+                    for route, is_prefix, check in self._routes
+                    if (request_path.startswith(route) if is_prefix else request_path == route)
+                ),
+                None,
+            )
+            if enforce is None:
+                return await call_next(request)
+            return await enforce(request, call_next)
+
 
 # Build facilitator config and app
 facilitator_config = FacilitatorConfig(url=FACILITATOR_URL)
 app = FastAPI()
 
-# Apply middleware for /weather
-app.middleware("http")(
-    require_payment(
-        path="/weather",
-        price="$0.001",
-        pay_to_address=ADDRESS,
-        network="base-sepolia",
-        facilitator_config=facilitator_config,
-    )
-)
-
-# Apply middleware for /premium/* (example uses TokenAmount)
-app.middleware("http")(
-    require_payment(
-        path="/premium/*",
-        price=TokenAmount(
+# one middleware serves every paid route; unprotected requests go straight to the app
+payment_matcher = (
+    PaymentMatcher()
+    # /weather priced in dollars
+    .add("/weather", "$0.001", ADDRESS, "base-sepolia", facilitator_config)
+    # /premium/* (example uses TokenAmount)
+    .add(
+        "/premium/*",
+        TokenAmount(
             amount="10000",
             asset=TokenAsset(
                 address="0x036CbD53842c5426634e7929541eC2318f3dCF7e",
@@ -136,11 +148,12 @@ app.middleware("http")(
                 eip712=EIP712Domain(name="USDC", version="2") if hasattr(globals().get("EIP712Domain"), "__name__") else None,
             ),
         ),
-        pay_to_address=ADDRESS,
-        network="base-sepolia",
-        facilitator_config=facilitator_config,
+        ADDRESS,
+        "base-sepolia",
+        facilitator_config,
     )
 )
+app.middleware("http")(payment_matcher.middleware)
 
 
 @app.get("/weather")
@@ -154,6 +167,8 @@ async def get_premium_content() -> Dict[str, Any]:
 
 
 if __name__ == "__main__":
+    import importlib.util
+
     import uvicorn
 
     print("Running x402 FastAPI payment demo")
@@ -161,5 +176,10 @@ if __name__ == "__main__":
         print("Using real x402 package for middleware")
     else:
         print("x402 package not found; running with stubbed middleware (local mock behavior)")
-    uvicorn.run(app, host="0.0.0.0", port=4021)
+    # Prefer the libuv event loop and the httptools parser when installed (Linux/macOS); both are
+    # drop-in replacements for asyncio's selector loop and h11 with noticeably higher throughput.
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    print(f"Event loop: {loop}, HTTP parser: {http}")
+    uvicorn.run(app, host="0.0.0.0", port=4021, loop=loop, http=http)
 
@@ -1,22 +1,184 @@
 import os
+import copy
+import time
+import asyncio
+import contextvars
+import functools
 import logging
-from typing import Optional, Dict, Any
+import ssl
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
 
 import httpx
 
-import importlib
+from swarms.structs.agent import Agent
+from swarms.utils import x402_http
 
-Account = None
-try:
-    eth_acc_mod = importlib.import_module("eth_account")
-    Account = getattr(eth_acc_mod, "Account", None)
-except Exception:
-    Account = None
+logger = logging.getLogger(__name__)
 
+# httpx transports only retry failed connection attempts, so this is safe for non-idempotent POSTs
+_CONNECT_RETRIES = 2
 
-from swarms.structs.agent import Agent
+_FACILITATOR_ENDPOINTS = ("list", "create_payment", "verify", "settle", "batch")
+
+# /batch is not a documented facilitator endpoint: facilitator URL -> monotonic time until which we
+# skip it after a rejection, so a transient 401/5xx doesn't disable batching for the process lifetime
+_BATCH_UNSUPPORTED: Dict[str, float] = {}
+_BATCH_RETRY_AFTER = 300.0
+# failures that happen before the request is written, so the individual steps can safely run instead
+_BATCH_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+# /list responses rarely change within a process; share them across agents keyed by facilitator URL.
+_FACILITATOR_CACHE_TTL = 30.0
+_FACILITATOR_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# Set to a dict to give the current context (a test, a request) its own facilitator cache.
+_FACILITATOR_CACHE_OVERRIDE: contextvars.ContextVar[Optional[Dict[str, Tuple[float, Dict[str, Any]]]]] = contextvars.ContextVar(
+    "x402_facilitator_cache", default=None
+)
+# One lock per facilitator URL so agents constructed concurrently issue a single /list probe;
+# _FACILITATOR_LOCK only guards creation of those per-URL locks.
+_FACILITATOR_LOCK = threading.Lock()
+_FACILITATOR_URL_LOCKS: Dict[str, threading.Lock] = {}
+
+
+def _facilitator_cache() -> Dict[str, Tuple[float, Dict[str, Any]]]:
+    override = _FACILITATOR_CACHE_OVERRIDE.get()
+    return _FACILITATOR_CACHE if override is None else override
+
+
+def _facilitator_lock(url: str) -> threading.Lock:
+    with _FACILITATOR_LOCK:
+        lock = _FACILITATOR_URL_LOCKS.get(url)
+        if lock is None:
+            lock = _FACILITATOR_URL_LOCKS[url] = threading.Lock()
+        return lock
+
+
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    # loading the CA bundle costs ~20ms, so the per-call async clients below share one context
+    return httpx.create_ssl_context()
+
+
+# (agent, client) serving the async call in progress; nested calls on the same agent reuse its client.
+_ASYNC_CLIENT: contextvars.ContextVar[Optional[Tuple[Any, httpx.AsyncClient]]] = contextvars.ContextVar("x402_async_client", default=None)
+
+
+def _with_async_client(method):
+    """Give an async agent method an AsyncClient scoped to the outermost call.
+
+    Async connections belong to the event loop that opened them, so a client kept on the agent would
+    outlive loops started by successive `asyncio.run` calls and leak their pools. Requests within one
+    call (a whole payment flow, including gathered sub-tasks) still share one pool.
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        current = _ASYNC_CLIENT.get()
+        if current is not None and current[0] is self:
+            return await method(self, *args, **kwargs)
+        async with self._new_async_client() as client:
+            token = _ASYNC_CLIENT.set((self, client))
+            try:
+                return await method(self, *args, **kwargs)
+            finally:
+                _ASYNC_CLIENT.reset(token)
+
+    return wrapper
+
+
+# Max signed intents remembered per agent by `_sign_intent_cached`.
+_SIG_CACHE_SIZE = 128
+
+# Static parts of the payment intent built by `_build_eip712_intent`. Shared by reference across
+# calls; they are only read (by the signer and the JSON encoder) and must not be mutated.
+_EIP712_DOMAIN: Dict[str, Any] = {
+    "name": "x402 Payment",
+    "version": "1",
+    "chainId": 1,
+    "verifyingContract": "0x0000000000000000000000000000000000000000",
+}
+_EIP712_TYPES: Dict[str, Any] = {
+    "EIP712Domain": [
+        {"name": "name", "type": "string"},
+        {"name": "version", "type": "string"},
+        {"name": "chainId", "type": "uint256"},
+        {"name": "verifyingContract", "type": "address"},
+    ],
+    "Payment": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "amount", "type": "string"},
+        {"name": "currency", "type": "string"},
+        {"name": "memo", "type": "string"},
+        {"name": "network", "type": "string"},
+    ],
+}
+
+_PAYMENT_MESSAGE_TYPES: Dict[str, Any] = {"Payment": _EIP712_TYPES["Payment"]}
+
+
+@functools.lru_cache(maxsize=1)
+def _eip712_hashing():
+    """Resolve eth_account's EIP-712 hashing helpers and hash the constant domain once.
+
+    Returns None on eth_account releases that predate these helpers.
+    """
+    try:
+        from eth_account._utils.encode_typed_data.encoding_and_hashing import hash_domain, hash_eip712_message
+        from eth_account.messages import SignableMessage
+    except ImportError:
+        return None
+    return hash_domain(_EIP712_DOMAIN), hash_eip712_message, SignableMessage
 
-logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=128)
+def _encode_payment_intent(message_items: Tuple[Tuple[str, Any], ...]):
+    """Encode a payment intent message as an EIP-712 signable message.
+
+    The domain separator is computed once per process, so each new intent only hashes its message
+    struct; repeated intents are served from the LRU cache.
+    """
+    message = dict(message_items)
+    hashing = _eip712_hashing()
+    if hashing is None:
+        from eth_account.messages import encode_structured_data
+
+        return encode_structured_data({"types": _EIP712_TYPES, "domain": _EIP712_DOMAIN, "primaryType": "Payment", "message": message})
+    domain_separator, hash_message, SignableMessage = hashing
+    return SignableMessage(b"\x01", domain_separator, hash_message(_PAYMENT_MESSAGE_TYPES, message))
+
+
+@dataclass(slots=True)
+class StepResult:
+    """Outcome of a single facilitator call within a payment flow.
+
+    Flows branch on `status_code` many times per call, so steps are kept as slotted objects and only
+    turned into plain dicts (omitting unset fields) at the public method boundary.
+    """
+
+    status_code: int = 0
+    payload: Any = None
+    headers: Optional[Dict[str, str]] = None
+    error: Optional[str] = None
+    request_body: Optional[Dict[str, Any]] = None
+    response_text: Optional[str] = None
+    facilitator_info: Optional[Dict[str, Any]] = None
+    diagnostics: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    def add_diagnostics(self, **items: Any) -> None:
+        if self.diagnostics is None:
+            self.diagnostics = {}
+        self.diagnostics.update(items)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: value for name in self.__slots__ if (value := getattr(self, name)) is not None}
 
 
 class X402PaymentAgent(Agent):
@@ -26,15 +188,34 @@ class X402PaymentAgent(Agent):
         wallet_private_key: Optional[str] = None,
         network: Optional[str] = None,
         *args,
+        cache_ttl: float = 0.0,
         **kwargs,
     ):
         super().__init__(*args, **kwargs)
-        self.facilitator_url = os.getenv("FACILITATOR_URL", facilitator_url).rstrip("/")
+        self.facilitator_url = os.getenv("FACILITATOR_URL", facilitator_url)
         self.wallet_private_key = wallet_private_key or os.getenv("X402_PRIVATE_KEY") or os.getenv("PAYAI_WALLET_PRIVATE_KEY")
         self.network = network or os.getenv("X402_NETWORK")
         self.wallet_address = None
         self.account = None
-        self._http_client = httpx.Client(timeout=30)
+        # private key the current `account` was derived from
+        self._wallet_key_loaded: Optional[str] = None
+        # EIP-712 signatures keyed by the signed message; reset whenever the wallet changes
+        self._sig_cache: Dict[tuple, Tuple[Dict[str, Any], str]] = {}
+        # settled flow results keyed by (amount, currency, memo); every flow is a real payment, so reuse is
+        # opt-in: only callers that retry the same purchase should set cache_ttl > 0
+        self.cache_ttl = cache_ttl
+        self._flow_cache: Dict[tuple, Tuple[float, Dict[str, Any]]] = {}
+        # the flow issues several requests to one host, so multiplex them over a single HTTP/2
+        # connection when h2 is available (httpx negotiates via ALPN and falls back to HTTP/1.1).
+        # The transport retries connection failures so a transient blip doesn't trigger the mock fallback.
+        self._http_client = httpx.Client(
+            timeout=30,
+            transport=httpx.HTTPTransport(
+                retries=_CONNECT_RETRIES,
+                http2=x402_http.HTTP2,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0),
+            ),
+        )
         if self.wallet_private_key:
             try:
                 self.init_wallet()
@@ -43,64 +224,190 @@ class X402PaymentAgent(Agent):
 
         # cache for facilitator discovery
         self._facilitator_info: Dict[str, Any] = {}
+        # the reachability probe (and mock fallback) runs before the first facilitator request rather
+        # than here, so constructing many agents costs no network round trips
+        self._facilitator_checked = False
+        self._facilitator_probe_lock = threading.Lock()
+        self._facilitator_probe_alocks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
 
-        # ensure the facilitator is reachable; if not, fall back to local mock
-        try:
-            info = self.discover_facilitator(timeout=3)
-            if info.get("status_code", 0) == 0 or info.get("status_code") >= 500:
-                # fallback
-                logger.warning(f"facilitator {self.facilitator_url} unreachable or returned {info.get('status_code')}; falling back to local mock")
-                self.facilitator_url = os.getenv("MOCK_FACILITATOR_URL", "http://127.0.0.1:8000")
-                # refresh info
-                try:
-                    self.discover_facilitator()
-                except Exception:
-                    pass
-        except Exception:
-            # on exception, also fallback to mock
-            logger.warning("error discovering facilitator; falling back to local mock")
-            self.facilitator_url = os.getenv("MOCK_FACILITATOR_URL", "http://127.0.0.1:8000")
-            try:
-                self.discover_facilitator()
-            except Exception:
-                pass
+    @property
+    def facilitator_url(self) -> str:
+        return self._facilitator_url
+
+    @facilitator_url.setter
+    def facilitator_url(self, url: str) -> None:
+        # endpoint URLs are rebuilt only when the facilitator changes (e.g. the mock fallback)
+        self._facilitator_url = url.rstrip("/")
+        self._endpoints = {name: f"{self._facilitator_url}/{name}" for name in _FACILITATOR_ENDPOINTS}
 
     def init_wallet(self):
+        Account = x402_http.get_account()
         if Account is None:
             raise RuntimeError("eth_account not installed; cannot initialize wallet from private key")
+        if self.account is not None and self._wallet_key_loaded == self.wallet_private_key:
+            return self.wallet_address
         priv = self.wallet_private_key
         if priv and not priv.startswith("0x"):
             priv = "0x" + priv
         acct = Account.from_key(priv)
         self.account = acct
         self.wallet_address = acct.address
+        self._wallet_key_loaded = self.wallet_private_key
+        self._sig_cache = {}
         return self.wallet_address
 
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=30,
+            transport=httpx.AsyncHTTPTransport(
+                verify=_ssl_context(),
+                retries=_CONNECT_RETRIES,
+                http2=x402_http.HTTP2,
+                limits=httpx.Limits(max_connections=256, keepalive_expiry=30.0),
+            ),
+        )
+
+    @staticmethod
+    def _get_async_client() -> httpx.AsyncClient:
+        # set by `_with_async_client` on the public async method being run
+        return _ASYNC_CLIENT.get()[1]
+
+    @staticmethod
+    def invalidate_facilitator_cache(url: Optional[str] = None) -> None:
+        """Drop the cached /list response for `url`, or for every facilitator when `url` is None."""
+        cache = _facilitator_cache()
+        if url is None:
+            cache.clear()
+        else:
+            cache.pop(url.rstrip("/"), None)
+
+    def _cached_facilitator_info(self) -> Optional[Tuple[float, Dict[str, Any]]]:
+        return _facilitator_cache().get(self.facilitator_url)
+
+    def _fresh_facilitator_info(self, cached: Optional[Tuple[float, Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        if cached is not None and time.monotonic() - cached[0] < _FACILITATOR_CACHE_TTL:
+            self._facilitator_info = cached[1]
+            # the cached dict is shared by every agent in the process; callers get their own copy
+            return copy.deepcopy(cached[1])
+        return None
+
+    def _remember_facilitator_info(self, info: Dict[str, Any], cached: Optional[Tuple[float, Dict[str, Any]]]) -> Dict[str, Any]:
+        status = info.get("status_code", 0)
+        if 200 <= status < 300:
+            _facilitator_cache()[self.facilitator_url] = (time.monotonic(), info)
+        elif cached is not None and (status == 0 or status >= 500):
+            # facilitator outage: serve the last good response, flagged as stale
+            info = dict(cached[1], stale=True)
+        self._facilitator_info = info
+        return copy.deepcopy(info)
+
     def discover_facilitator(self, timeout: int = 5) -> Dict[str, Any]:
-        """Call /list on the facilitator and cache the response for diagnostics and network support checks."""
-        try:
-            url = f"{self.facilitator_url.rstrip('/')}/list"
-            r = self._http_client.get(url, timeout=timeout)
+        """Call /list on the facilitator and cache the response for diagnostics and network support checks.
+
+        The cache is shared by every agent in the process; concurrent callers for the same URL wait
+        on one probe instead of each issuing their own.
+        """
+        fresh = self._fresh_facilitator_info(self._cached_facilitator_info())
+        if fresh is not None:
+            return fresh
+        with _facilitator_lock(self.facilitator_url):
+            # another agent may have completed the probe while we waited
+            cached = self._cached_facilitator_info()
+            fresh = self._fresh_facilitator_info(cached)
+            if fresh is not None:
+                return fresh
             try:
-                payload = r.json()
-            except Exception:
-                payload = {"text": r.text}
-            info = {"status_code": r.status_code, "payload": payload, "headers": dict(r.headers)}
+                url = self._endpoints["list"]
+                r = self._http_client.get(url, timeout=timeout)
+                payload = x402_http.parse_response(r)
+                info = {"status_code": r.status_code, "payload": payload, "headers": x402_http.select_headers(r.headers)}
+            except Exception as e:
+                info = {"status_code": 0, "error": str(e)}
+            return self._remember_facilitator_info(info, cached)
+
+    @_with_async_client
+    async def adiscover_facilitator(self, timeout: int = 5) -> Dict[str, Any]:
+        """Async variant of `discover_facilitator` using the call's AsyncClient.
+
+        Reads through the same shared cache but does not take the per-URL lock, which would block the event loop.
+        """
+        cached = self._cached_facilitator_info()
+        fresh = self._fresh_facilitator_info(cached)
+        if fresh is not None:
+            return fresh
+        try:
+            url = self._endpoints["list"]
+            r = await self._get_async_client().get(url, timeout=timeout)
+            payload = x402_http.parse_response(r)
+            info = {"status_code": r.status_code, "payload": payload, "headers": x402_http.select_headers(r.headers)}
         except Exception as e:
             info = {"status_code": 0, "error": str(e)}
-        self._facilitator_info = info
-        return info
+        return self._remember_facilitator_info(info, cached)
 
-    def paid_api_call(
-        self,
-        path: str,
-        amount: float,
-        currency: str = "USD",
-        metadata: Optional[Dict[str, Any]] = None,
-        timeout: int = 30,
-    ) -> Dict[str, Any]:
-        url = f"{self.facilitator_url}/{path.lstrip('/') }"
-        headers = {"Content-Type": "application/json"}
+    @staticmethod
+    def _facilitator_unreachable(info: Dict[str, Any]) -> bool:
+        status = info.get("status_code", 0)
+        return status == 0 or status >= 500
+
+    def _use_mock_facilitator(self) -> None:
+        self.facilitator_url = os.getenv("MOCK_FACILITATOR_URL", "http://127.0.0.1:8000")
+
+    def _probe_facilitator(self) -> None:
+        try:
+            info = self.discover_facilitator(timeout=3)
+            if not self._facilitator_unreachable(info) or info.get("stale"):
+                return
+            logger.warning(f"facilitator {self.facilitator_url} unreachable or returned {info.get('status_code')}; falling back to local mock")
+        except Exception:
+            logger.warning("error discovering facilitator; falling back to local mock")
+        self._use_mock_facilitator()
+        try:
+            self.discover_facilitator()
+        except Exception:
+            pass
+
+    async def _aprobe_facilitator(self) -> None:
+        try:
+            info = await self.adiscover_facilitator(timeout=3)
+            if not self._facilitator_unreachable(info) or info.get("stale"):
+                return
+            logger.warning(f"facilitator {self.facilitator_url} unreachable or returned {info.get('status_code')}; falling back to local mock")
+        except Exception:
+            logger.warning("error discovering facilitator; falling back to local mock")
+        self._use_mock_facilitator()
+        try:
+            await self.adiscover_facilitator()
+        except Exception:
+            pass
+
+    def _ensure_facilitator(self) -> None:
+        """Probe the facilitator once per agent and fall back to the local mock if it is unreachable.
+
+        Concurrent first callers wait for that one probe, so none of them posts to the facilitator
+        before the fallback decision is made (and the URL possibly switched).
+        """
+        if self._facilitator_checked:
+            return
+        with self._facilitator_probe_lock:
+            if not self._facilitator_checked:
+                self._probe_facilitator()
+                self._facilitator_checked = True
+
+    async def _aensure_facilitator(self) -> None:
+        """Async variant of `_ensure_facilitator`."""
+        if self._facilitator_checked:
+            return
+        # asyncio locks belong to one event loop, so keep one per loop the agent is used on
+        loop = asyncio.get_running_loop()
+        lock = self._facilitator_probe_alocks.get(loop)
+        if lock is None:
+            lock = self._facilitator_probe_alocks[loop] = asyncio.Lock()
+        async with lock:
+            if not self._facilitator_checked:
+                await self._aprobe_facilitator()
+                self._facilitator_checked = True
+
+    def _request_body(self, amount: float, currency: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         # Try to be flexible about amount shape: send as number and as string in diagnostics
         body = {"amount": amount, "currency": currency}
         if metadata:
@@ -109,65 +416,244 @@ class X402PaymentAgent(Agent):
             body["from_address"] = self.wallet_address
         if self.network:
             body["network"] = self.network
+        return body
+
+    def _step_from_response(self, resp: httpx.Response, body: Dict[str, Any]) -> StepResult:
+        step = StepResult(status_code=resp.status_code, payload=x402_http.parse_response(resp), headers=x402_http.select_headers(resp.headers))
+        # attach diagnostics when non-2xx
+        if not step.ok:
+            step.request_body = body
+            step.response_text = resp.text
+        return step
+
+    def _call_step(
+        self,
+        path: str,
+        amount: float,
+        currency: str = "USD",
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+    ) -> StepResult:
+        self._ensure_facilitator()
+        url = self._endpoints.get(path) or f"{self.facilitator_url}/{path.lstrip('/')}"
+        body = self._request_body(amount, currency, metadata)
         try:
-            resp = self._http_client.post(url, headers=headers, json=body, timeout=timeout)
+            resp = self._http_client.post(url, headers=x402_http.JSON_HEADERS, content=x402_http.dumps(body), timeout=timeout)
+        except Exception as e:
+            logger.error(f"paid_api_call error: {e}")
+            return StepResult(error=str(e))
+        step = self._step_from_response(resp, body)
+        # attempt to discover facilitator info if not known
+        if not step.ok and not self._facilitator_info:
             try:
-                payload = resp.json()
+                step.facilitator_info = self.discover_facilitator()
             except Exception:
-                payload = {"text": resp.text}
-            result = {
-                "status_code": resp.status_code,
-                "payload": payload,
-                "headers": dict(resp.headers),
-            }
-            # attach diagnostics when non-2xx
-            if not (200 <= resp.status_code < 300):
-                result["request_body"] = body
-                result["response_text"] = resp.text
-                # attempt to discover facilitator info if not known
-                if not self._facilitator_info:
-                    try:
-                        self.discover_facilitator()
-                        result["facilitator_info"] = self._facilitator_info
-                    except Exception:
-                        pass
-            return result
+                pass
+        return step
+
+    async def _acall_step(
+        self,
+        path: str,
+        amount: float,
+        currency: str = "USD",
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+    ) -> StepResult:
+        await self._aensure_facilitator()
+        url = self._endpoints.get(path) or f"{self.facilitator_url}/{path.lstrip('/')}"
+        body = self._request_body(amount, currency, metadata)
+        try:
+            resp = await self._get_async_client().post(url, headers=x402_http.JSON_HEADERS, content=x402_http.dumps(body), timeout=timeout)
         except Exception as e:
-            logger.error(f"paid_api_call error: {e}")
-            return {"status_code": 0, "error": str(e)}
+            logger.error(f"apaid_api_call error: {e}")
+            return StepResult(error=str(e))
+        step = self._step_from_response(resp, body)
+        if not step.ok and not self._facilitator_info:
+            try:
+                step.facilitator_info = await self.adiscover_facilitator()
+            except Exception:
+                pass
+        return step
 
-    def create_payment_session(self, amount: float, currency: str = "USD", memo: Optional[str] = None):
+    def paid_api_call(
+        self,
+        path: str,
+        amount: float,
+        currency: str = "USD",
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+    ) -> Dict[str, Any]:
+        return self._call_step(path, amount, currency, metadata, timeout).to_dict()
+
+    @_with_async_client
+    async def apaid_api_call(
+        self,
+        path: str,
+        amount: float,
+        currency: str = "USD",
+        metadata: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+    ) -> Dict[str, Any]:
+        """Async variant of `paid_api_call`; many calls can be in flight on one event loop."""
+        return (await self._acall_step(path, amount, currency, metadata, timeout)).to_dict()
+
+    def _batch_ops(self, steps: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return [
+            {"path": path, "body": self._request_body(params["amount"], params.get("currency", "USD"), params.get("metadata"))}
+            for path, params in steps
+        ]
+
+    def _parse_batch_response(self, resp: httpx.Response, steps: List[Tuple[str, Dict[str, Any]]]) -> Optional[List[StepResult]]:
+        results = None
+        if 200 <= resp.status_code < 300:
+            payload = x402_http.parse_response(resp)
+            results = payload.get("results") if isinstance(payload, dict) else None
+        if not (
+            isinstance(results, list)
+            and len(results) == len(steps)
+            and all(isinstance(item, dict) and isinstance(item.get("status_code"), int) for item in results)
+        ):
+            # rejected (no endpoint, auth, server error) or not a batch reply at all, e.g. a catch-all
+            # route answering 200: run the individual steps, and skip /batch here for a while
+            _BATCH_UNSUPPORTED[self.facilitator_url] = time.monotonic() + _BATCH_RETRY_AFTER
+            return None
+        _BATCH_UNSUPPORTED.pop(self.facilitator_url, None)
+        return [StepResult(status_code=item["status_code"], payload=item.get("payload")) for item in results]
+
+    def _batch_disabled(self) -> bool:
+        return time.monotonic() < _BATCH_UNSUPPORTED.get(self.facilitator_url, 0.0)
+
+    def _post_batch(self, steps: List[Tuple[str, Dict[str, Any]]], timeout: int = 30) -> Optional[List[StepResult]]:
+        """POST `steps` to /batch in one round trip.
+
+        Returns None when the facilitator rejects the batch or it could not be sent, so the caller runs the steps individually.
+        """
+        self._ensure_facilitator()
+        if self._batch_disabled():
+            return None
+        try:
+            resp = self._http_client.post(self._endpoints["batch"], content=x402_http.dumps({"ops": self._batch_ops(steps)}), headers=x402_http.JSON_HEADERS, timeout=timeout)
+        except _BATCH_NOT_SENT_ERRORS as e:
+            logger.debug(f"batch request failed, using individual calls: {e}")
+            return None
+        except Exception as e:
+            # the batch may have reached the facilitator (e.g. read timeout); replaying the steps could pay twice
+            logger.error(f"batch request error: {e}")
+            return [StepResult(error=str(e)) for _ in steps]
+        return self._parse_batch_response(resp, steps)
+
+    async def _apost_batch(self, steps: List[Tuple[str, Dict[str, Any]]], timeout: int = 30) -> Optional[List[StepResult]]:
+        await self._aensure_facilitator()
+        if self._batch_disabled():
+            return None
+        try:
+            resp = await self._get_async_client().post(self._endpoints["batch"], content=x402_http.dumps({"ops": self._batch_ops(steps)}), headers=x402_http.JSON_HEADERS, timeout=timeout)
+        except _BATCH_NOT_SENT_ERRORS as e:
+            logger.debug(f"batch request failed, using individual calls: {e}")
+            return None
+        except Exception as e:
+            # the batch may have reached the facilitator (e.g. read timeout); replaying the steps could pay twice
+            logger.error(f"batch request error: {e}")
+            return [StepResult(error=str(e)) for _ in steps]
+        return self._parse_batch_response(resp, steps)
+
+    def paid_api_batch(self, steps: List[Tuple[str, Dict[str, Any]]], timeout: int = 30) -> List[Dict[str, Any]]:
+        """Run several facilitator calls in a single POST /batch, falling back to one call per step.
+
+        Each step is `(path, params)` where params holds `amount` and optionally `currency` and `metadata`.
+        A facilitator that rejects /batch (or answers without the batch shape) is skipped for
+        `_BATCH_RETRY_AFTER` seconds, so unsupported facilitators only pay for the probe occasionally.
+        """
+        results = self._post_batch(steps, timeout=timeout)
+        if results is None:
+            results = [
+                self._call_step(path, params["amount"], params.get("currency", "USD"), params.get("metadata"), timeout)
+                for path, params in steps
+            ]
+        return [step.to_dict() for step in results]
+
+    def _flow_steps(self, amount: float, currency: str, memo: Optional[str]) -> List[Tuple[str, Dict[str, Any]]]:
+        params = {"amount": amount, "currency": currency, "metadata": {"memo": memo} if memo else None}
+        return [("create_payment", params), ("verify", params), ("settle", params)]
+
+    @staticmethod
+    def _verified_as_create(verify: StepResult) -> StepResult:
+        payload = verify.payload if isinstance(verify.payload, dict) else {}
+        return StepResult(
+            status_code=verify.status_code,
+            payload={
+                "id": payload.get("id", None) or verify.payload,
+                "status": "verified-as-create",
+                "received": payload.get("received", verify.payload),
+            },
+            headers=verify.headers,
+        )
+
+    def _create_step(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> StepResult:
         metadata = {"memo": memo} if memo else None
-        create_res = self.paid_api_call("create_payment", amount=amount, currency=currency, metadata=metadata)
+        create = self._call_step("create_payment", amount, currency, metadata)
         # If the facilitator returns 404, try verify. If it returns 400, include diagnostics and try verify anyway.
-        status = create_res.get("status_code", 0)
-        if status == 404:
+        if create.status_code == 404:
             logger.info("facilitator returned 404 for /create_payment; falling back to /verify for intent creation")
-            verify_res = self.paid_api_call("verify", amount=amount, currency=currency, metadata=metadata)
-            if 200 <= verify_res.get("status_code", 0) < 300:
-                return {
-                    "status_code": verify_res.get("status_code"),
-                    "payload": {
-                        "id": verify_res.get("payload", {}).get("id", None) or verify_res.get("payload"),
-                        "status": "verified-as-create",
-                        "received": verify_res.get("payload", {}).get("received", verify_res.get("payload")),
-                    },
-                    "headers": verify_res.get("headers"),
-                }
-            return verify_res
-        elif status == 400:
+            verify = self._call_step("verify", amount, currency, metadata)
+            return self._verified_as_create(verify) if verify.ok else verify
+        elif create.status_code == 400:
             # Bad request from facilitator: include request/response diagnostics and attempt verify as fallback
-            logger.warning(f"create_payment returned 400: {create_res.get('payload')}. Attempting /verify fallback and including diagnostics.")
+            logger.warning(f"create_payment returned 400: {create.payload}. Attempting /verify fallback and including diagnostics.")
             # try verify anyway
-            verify_res = self.paid_api_call("verify", amount=amount, currency=currency, metadata=metadata)
-            # Attach diagnostics to create_res for caller visibility
-            create_res.setdefault("diagnostics", {})
-            create_res["diagnostics"]["note"] = "create_payment returned 400; see response_text and request_body"
-            create_res["diagnostics"]["facilitator_list"] = self.discover_facilitator()
-            # Return combined result where create contains diagnostics and verify result included by caller's complete_flow
-            # Caller will proceed to verify/settle based on verify_res status
-            return create_res
-        return create_res
+            self._call_step("verify", amount, currency, metadata)
+            # Attach diagnostics to the create result for caller visibility; the caller's complete flow
+            # proceeds to verify/settle on its own
+            create.add_diagnostics(
+                note="create_payment returned 400; see response_text and request_body",
+                facilitator_list=self.discover_facilitator(),
+            )
+        return create
+
+    async def _acreate_step(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> StepResult:
+        metadata = {"memo": memo} if memo else None
+        create = await self._acall_step("create_payment", amount, currency, metadata)
+        if create.status_code == 404:
+            logger.info("facilitator returned 404 for /create_payment; falling back to /verify for intent creation")
+            verify = await self._acall_step("verify", amount, currency, metadata)
+            return self._verified_as_create(verify) if verify.ok else verify
+        elif create.status_code == 400:
+            logger.warning(f"create_payment returned 400: {create.payload}. Attempting /verify fallback and including diagnostics.")
+            await self._acall_step("verify", amount, currency, metadata)
+            create.add_diagnostics(
+                note="create_payment returned 400; see response_text and request_body",
+                facilitator_list=await self.adiscover_facilitator(),
+            )
+        return create
+
+    def create_payment_session(self, amount: float, currency: str = "USD", memo: Optional[str] = None):
+        return self._create_step(amount, currency, memo).to_dict()
+
+    @_with_async_client
+    async def acreate_payment_session(self, amount: float, currency: str = "USD", memo: Optional[str] = None):
+        """Async variant of `create_payment_session` with the same 404/400 fallbacks."""
+        return (await self._acreate_step(amount, currency, memo)).to_dict()
+
+    def _flow_key(self, amount: float, currency: str, memo: Optional[str]) -> tuple:
+        # a settled flow only answers for the same payer, network and facilitator
+        return (round(amount, 8), currency, memo, self.wallet_address, self.network, self.facilitator_url)
+
+    def _cached_flow(self, key: tuple) -> Optional[Dict[str, Any]]:
+        if self.cache_ttl <= 0:
+            return None
+        ts, cached = self._flow_cache.get(key, (0.0, None))
+        if cached is not None and time.monotonic() - ts < self.cache_ttl:
+            # callers own the returned dict; never hand out the cached one
+            return copy.deepcopy(cached)
+        return None
+
+    def _remember_flow(self, key: tuple, result: Dict[str, Any]) -> None:
+        if self.cache_ttl > 0 and 200 <= result.get("settle", {}).get("status_code", 0) < 300:
+            self._flow_cache[key] = (time.monotonic(), copy.deepcopy(result))
+
+    @staticmethod
+    def _flow_result(create: StepResult, verify: StepResult, settle: StepResult) -> Dict[str, Any]:
+        return {"create": create.to_dict(), "verify": verify.to_dict(), "settle": settle.to_dict()}
 
     def complete_payment_flow(self, amount: float, currency: str = "USD", memo: Optional[str] = None, timeout: int = 30) -> Dict[str, Any]:
         """
@@ -175,74 +661,139 @@ class X402PaymentAgent(Agent):
 
         Returns a dictionary with keys: create, verify, settle each containing the facilitator response.
         This is intentionally simple: it delegates to the facilitator endpoints and returns their JSON.
+        With `cache_ttl` > 0, a settled result is returned again (without paying) for identical calls within
+        that many seconds; by default every call pays.
         """
-        result: Dict[str, Any] = {}
+        # resolve the facilitator first: the mock fallback changes the URL that is part of the cache key
+        self._ensure_facilitator()
+        flow_key = self._flow_key(amount, currency, memo)
+        cached = self._cached_flow(flow_key)
+        if cached is not None:
+            return cached
+        # one round trip when the facilitator exposes /batch; otherwise the step-by-step flow below
+        batched = self._post_batch(self._flow_steps(amount, currency, memo), timeout=timeout)
+        if batched is not None:
+            result = self._flow_result(*batched)
+            self._remember_flow(flow_key, result)
+            return result
+        metadata = {"memo": memo} if memo else None
         try:
-            create_res = self.create_payment_session(amount=amount, currency=currency, memo=memo)
-            result["create"] = create_res
+            create = self._create_step(amount, currency, memo)
         except Exception as e:
-            result["create"] = {"status_code": 0, "error": str(e)}
+            create = StepResult(error=str(e))
 
-        verify_payload = None
         try:
-            status = result.get("create", {}).get("status_code", 0)
             # Normal path: if create succeeded, call verify
-            if 200 <= status < 300:
-                verify_res = self.paid_api_call("verify", amount=amount, currency=currency, metadata={"memo": memo} if memo else None, timeout=timeout)
+            if create.ok:
+                verify = self._call_step("verify", amount, currency, metadata, timeout)
             # Fallback: some facilitators (e.g. PayAI) may return 400 for create and expect verify/settle directly
-            elif status in (400, 404):
-                logger.info(f"create returned status {status}; attempting verify fallback")
+            elif create.status_code in (400, 404):
+                logger.info(f"create returned status {create.status_code}; attempting verify fallback")
                 # First try the simple verify payload
-                verify_res = self.paid_api_call("verify", amount=amount, currency=currency, metadata={"memo": memo} if memo else None, timeout=timeout)
+                verify = self._call_step("verify", amount, currency, metadata, timeout)
                 # If verify did not succeed, attempt an EIP-712 signed verify fallback
-                vstatus = verify_res.get("status_code", 0)
-                if not (200 <= vstatus < 300):
-                    logger.info(f"simple verify returned {vstatus}; attempting verify_with_signature fallback")
-                    sig_res = self.verify_with_signature(amount=amount, currency=currency, memo=memo)
+                if not verify.ok:
+                    logger.info(f"simple verify returned {verify.status_code}; attempting verify_with_signature fallback")
+                    signed = self._signed_verify_step(amount, currency, memo)
                     # If signature-based verify succeeded, use that result
-                    if 200 <= sig_res.get("status_code", 0) < 300:
-                        verify_res = sig_res
+                    if signed.ok:
+                        verify = signed
                     else:
                         # attach both diagnostics to the response for caller visibility
-                        try:
-                            verify_res.setdefault("diagnostics", {})
-                            verify_res["diagnostics"]["create_response"] = result.get("create")
-                            verify_res["diagnostics"]["signature_attempt"] = sig_res
-                        except Exception:
-                            pass
+                        verify.add_diagnostics(create_response=create.to_dict(), signature_attempt=signed.to_dict())
                 else:
                     # attach create diagnostics to the verify result for caller visibility
-                    try:
-                        verify_res.setdefault("diagnostics", {})
-                        verify_res["diagnostics"]["create_response"] = result.get("create")
-                    except Exception:
-                        pass
+                    verify.add_diagnostics(create_response=create.to_dict())
             else:
-                verify_res = {"status_code": 0, "error": "create failed; skipping verify"}
-            result["verify"] = verify_res
+                verify = StepResult(error="create failed; skipping verify")
         except Exception as e:
-            result["verify"] = {"status_code": 0, "error": str(e)}
+            verify = StepResult(error=str(e))
 
         try:
-            vstatus = result.get("verify", {}).get("status_code", 0)
-            if 200 <= vstatus < 300:
-                settle_res = self.paid_api_call("settle", amount=amount, currency=currency, metadata={"memo": memo} if memo else None, timeout=timeout)
+            if verify.ok:
+                settle = self._call_step("settle", amount, currency, metadata, timeout)
+            # If verify returned 400 or 404, attempt settle as a last resort
+            elif verify.status_code in (400, 404):
+                logger.info(f"verify returned status {verify.status_code}; attempting settle fallback")
+                settle = self._call_step("settle", amount, currency, metadata, timeout)
+                settle.add_diagnostics(verify_response=verify.to_dict())
             else:
-                # If verify returned 400 or 404, attempt settle as a last resort
-                if vstatus in (400, 404):
-                    logger.info(f"verify returned status {vstatus}; attempting settle fallback")
-                    settle_res = self.paid_api_call("settle", amount=amount, currency=currency, metadata={"memo": memo} if memo else None, timeout=timeout)
-                    try:
-                        settle_res.setdefault("diagnostics", {})
-                        settle_res["diagnostics"]["verify_response"] = result.get("verify")
-                    except Exception:
-                        pass
+                settle = StepResult(error="verify failed; skipping settle")
+        except Exception as e:
+            settle = StepResult(error=str(e))
+
+        result = self._flow_result(create, verify, settle)
+        self._remember_flow(flow_key, result)
+        return result
+
+    async def _presign_intent(self, amount: float, currency: str, memo: Optional[str]):
+        """Build and sign the EIP-712 intent off the event loop; returns (structured, signature) or None."""
+        if self.account is None:
+            return None
+        return await asyncio.to_thread(self._sign_intent_cached, amount, currency, memo)
+
+    @_with_async_client
+    async def acomplete_payment_flow(self, amount: float, currency: str = "USD", memo: Optional[str] = None, timeout: int = 30) -> Dict[str, Any]:
+        """Async variant of `complete_payment_flow`.
+
+        The flow's requests share one AsyncClient, one agent can run many flows concurrently, and the
+        EIP-712 fallback intent is signed in a worker thread while the create request is in flight.
+        """
+        await self._aensure_facilitator()
+        flow_key = self._flow_key(amount, currency, memo)
+        cached = self._cached_flow(flow_key)
+        if cached is not None:
+            return cached
+        batched = await self._apost_batch(self._flow_steps(amount, currency, memo), timeout=timeout)
+        if batched is not None:
+            result = self._flow_result(*batched)
+            self._remember_flow(flow_key, result)
+            return result
+        metadata = {"memo": memo} if memo else None
+        presigned, create = await asyncio.gather(
+            self._presign_intent(amount, currency, memo),
+            self._acreate_step(amount, currency, memo),
+            return_exceptions=True,
+        )
+        if isinstance(presigned, BaseException):
+            presigned = None
+        if isinstance(create, BaseException):
+            create = StepResult(error=str(create))
+
+        try:
+            if create.ok:
+                verify = await self._acall_step("verify", amount, currency, metadata, timeout)
+            elif create.status_code in (400, 404):
+                logger.info(f"create returned status {create.status_code}; attempting verify fallback")
+                verify = await self._acall_step("verify", amount, currency, metadata, timeout)
+                if not verify.ok:
+                    logger.info(f"simple verify returned {verify.status_code}; attempting verify_with_signature fallback")
+                    signed = await self._asigned_verify_step(amount, currency, memo, presigned=presigned)
+                    if signed.ok:
+                        verify = signed
+                    else:
+                        verify.add_diagnostics(create_response=create.to_dict(), signature_attempt=signed.to_dict())
                 else:
-                    settle_res = {"status_code": 0, "error": "verify failed; skipping settle"}
-            result["settle"] = settle_res
+                    verify.add_diagnostics(create_response=create.to_dict())
+            else:
+                verify = StepResult(error="create failed; skipping verify")
         except Exception as e:
-            result["settle"] = {"status_code": 0, "error": str(e)}
+            verify = StepResult(error=str(e))
 
+        try:
+            if verify.ok:
+                settle = await self._acall_step("settle", amount, currency, metadata, timeout)
+            elif verify.status_code in (400, 404):
+                logger.info(f"verify returned status {verify.status_code}; attempting settle fallback")
+                settle = await self._acall_step("settle", amount, currency, metadata, timeout)
+                settle.add_diagnostics(verify_response=verify.to_dict())
+            else:
+                settle = StepResult(error="verify failed; skipping settle")
+        except Exception as e:
+            settle = StepResult(error=str(e))
+
+        result = self._flow_result(create, verify, settle)
+        self._remember_flow(flow_key, result)
         return result
 
     def _build_eip712_intent(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> Dict[str, Any]:
@@ -251,28 +802,6 @@ class X402PaymentAgent(Agent):
         This is intentionally generic: real facilitators may expect a different schema. The intent
         includes a minimal domain and message with amount, currency, from_address, to_address (if available), memo and network.
         """
-        domain = {
-            "name": "x402 Payment",
-            "version": "1",
-            "chainId": 1,
-            "verifyingContract": "0x0000000000000000000000000000000000000000",
-        }
-        types = {
-            "EIP712Domain": [
-                {"name": "name", "type": "string"},
-                {"name": "version", "type": "string"},
-                {"name": "chainId", "type": "uint256"},
-                {"name": "verifyingContract", "type": "address"},
-            ],
-            "Payment": [
-                {"name": "from", "type": "address"},
-                {"name": "to", "type": "address"},
-                {"name": "amount", "type": "string"},
-                {"name": "currency", "type": "string"},
-                {"name": "memo", "type": "string"},
-                {"name": "network", "type": "string"},
-            ],
-        }
         message = {
             "from": self.wallet_address or "0x0000000000000000000000000000000000000000",
             "to": os.getenv("PAYAI_MERCHANT_ADDRESS") or os.getenv("ADDRESS") or "0x0000000000000000000000000000000000000000",
@@ -281,17 +810,16 @@ class X402PaymentAgent(Agent):
             "memo": memo or "",
             "network": self.network or "",
         }
-        return {"types": types, "domain": domain, "primaryType": "Payment", "message": message}
+        return {"types": _EIP712_TYPES, "domain": _EIP712_DOMAIN, "primaryType": "Payment", "message": message}
 
     def _sign_eip712(self, structured_data: Dict[str, Any]) -> Optional[str]:
-        """Sign EIP-712 structured data using eth_account if available. Returns hex signature or None."""
+        """Sign an intent from `_build_eip712_intent` using eth_account if available. Returns hex signature or None."""
+        Account = x402_http.get_account()
         if Account is None:
             logger.debug("eth_account not installed; cannot sign EIP-712 payload")
             return None
         try:
-            from eth_account.messages import encode_structured_data
-
-            encoded = encode_structured_data(structured_data)
+            encoded = _encode_payment_intent(tuple(structured_data["message"].items()))
             # ensure private key has 0x
             priv = self.wallet_private_key
             if priv and not priv.startswith("0x"):
@@ -302,23 +830,70 @@ class X402PaymentAgent(Agent):
             logger.warning(f"failed signing structured data: {e}")
             return None
 
-    def verify_with_signature(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> Dict[str, Any]:
-        """Build an EIP-712 intent, sign it, and POST to /verify as a fallback for facilitators expecting signed intents.
+    def _sign_intent_cached(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Build and sign the EIP-712 intent, reusing the signature for an identical message.
 
-        The body shape is generic: { "eip712": <structured_data>, "signature": <hex>, "from_address": <addr>, "network": <network> }
-        Real facilitators may require different fields; this is a best-effort fallback.
+        The intent carries no nonce, so signing the same message with the same key always yields the
+        same signature; retries and fallbacks in one flow therefore only pay for signing once.
         """
         structured = self._build_eip712_intent(amount=amount, currency=currency, memo=memo)
+        key = tuple(structured["message"].values())
+        hit = self._sig_cache.get(key)
+        if hit is not None:
+            return hit
         signature = self._sign_eip712(structured)
+        if signature is not None:
+            if len(self._sig_cache) >= _SIG_CACHE_SIZE:
+                self._sig_cache.pop(next(iter(self._sig_cache)))
+            self._sig_cache[key] = (structured, signature)
+        return structured, signature
+
+    def _signed_verify_step(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> StepResult:
+        structured, signature = self._sign_intent_cached(amount, currency, memo)
         body = {"eip712": structured, "signature": signature, "from_address": self.wallet_address, "network": self.network}
-        url = f"{self.facilitator_url.rstrip('/')}/verify"
-        headers = {"Content-Type": "application/json"}
         try:
-            resp = self._http_client.post(url, json=body, headers=headers, timeout=30)
-            try:
-                payload = resp.json()
-            except Exception:
-                payload = {"text": resp.text}
-            return {"status_code": resp.status_code, "payload": payload, "headers": dict(resp.headers), "request_body": body}
+            resp = self._http_client.post(self._endpoints["verify"], content=x402_http.dumps(body), headers=x402_http.JSON_HEADERS, timeout=30)
         except Exception as e:
-            return {"status_code": 0, "error": str(e), "request_body": body}
+            return StepResult(error=str(e), request_body=body)
+        return StepResult(status_code=resp.status_code, payload=x402_http.parse_response(resp), headers=x402_http.select_headers(resp.headers), request_body=body)
+
+    async def _asigned_verify_step(
+        self,
+        amount: float,
+        currency: str = "USD",
+        memo: Optional[str] = None,
+        presigned: Optional[tuple] = None,
+    ) -> StepResult:
+        if presigned is not None:
+            structured, signature = presigned
+        else:
+            structured, signature = await asyncio.to_thread(self._sign_intent_cached, amount, currency, memo)
+        body = {"eip712": structured, "signature": signature, "from_address": self.wallet_address, "network": self.network}
+        try:
+            resp = await self._get_async_client().post(self._endpoints["verify"], content=x402_http.dumps(body), headers=x402_http.JSON_HEADERS, timeout=30)
+        except Exception as e:
+            return StepResult(error=str(e), request_body=body)
+        return StepResult(status_code=resp.status_code, payload=x402_http.parse_response(resp), headers=x402_http.select_headers(resp.headers), request_body=body)
+
+    def verify_with_signature(self, amount: float, currency: str = "USD", memo: Optional[str] = None) -> Dict[str, Any]:
+        """Build an EIP-712 intent, sign it, and POST to /verify as a fallback for facilitators expecting signed intents.
+
+        The body shape is generic: { "eip712": <structured_data>, "signature": <hex>, "from_address": <addr>, "network": <network> }
+        Real facilitators may require different fields; this is a best-effort fallback.
+        """
+        return self._signed_verify_step(amount, currency, memo).to_dict()
+
+    @_with_async_client
+    async def averify_with_signature(
+        self,
+        amount: float,
+        currency: str = "USD",
+        memo: Optional[str] = None,
+        presigned: Optional[tuple] = None,
+    ) -> Dict[str, Any]:
+        """Async variant of `verify_with_signature`.
+
+        `presigned` may carry a `(structured, signature)` pair produced ahead of time, e.g. while
+        the create request was in flight.
+        """
+        return (await self._asigned_verify_step(amount, currency, memo, presigned=presigned)).to_dict()
@@ -0,0 +1,65 @@
+"""HTTP and serialization helpers shared by the x402 payment tool and X402PaymentAgent."""
+
+import importlib
+import importlib.util
+import json
+import threading
+from typing import Any, Dict
+
+import httpx
+import orjson
+
+
+def dumps(obj: Any) -> bytes:
+    try:
+        return orjson.dumps(obj)
+    except TypeError:
+        # orjson only encodes 64-bit integers; base-unit (wei) amounts routinely exceed that
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+# multiplex requests to the facilitator over HTTP/2 when h2 is installed
+HTTP2 = importlib.util.find_spec("h2") is not None
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Response headers worth surfacing to callers; copying every header per response is wasted work.
+KEPT_HEADERS = ("content-type", "x-request-id", "retry-after", "x-payment-response")
+
+
+def select_headers(headers: httpx.Headers) -> Dict[str, str]:
+    # keys are always the lowercase names above, so callers can do a plain dict lookup
+    return {name: headers[name] for name in KEPT_HEADERS if name in headers}
+
+
+def parse_response(resp: httpx.Response) -> Any:
+    """Decode a facilitator response body once: JSON when it is declared (or undeclared), else text."""
+    content_type = resp.headers.get("content-type", "")
+    body = resp.content
+    if not content_type or "json" in content_type:
+        try:
+            # stdlib json keeps uint256 token amounts exact; orjson turns integers beyond 64 bits into floats
+            return json.loads(body)
+        except ValueError:
+            pass
+    return {"text": body.decode("utf-8", errors="replace")}
+
+
+# eth_account pulls in a heavy crypto import chain, so resolve it on first wallet use only.
+_Account = None
+_account_resolved = False
+_account_lock = threading.Lock()
+
+
+def get_account():
+    """Return eth_account's `Account`, importing it on first call; None when eth_account is missing."""
+    global _Account, _account_resolved
+    if not _account_resolved:
+        with _account_lock:
+            if not _account_resolved:
+                try:
+                    _Account = getattr(importlib.import_module("eth_account"), "Account", None)
+                except Exception:
+                    _Account = None
+                _account_resolved = True
+    return _Account
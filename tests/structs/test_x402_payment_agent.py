@@ -0,0 +1,528 @@
+import asyncio
+import contextvars
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+import pytest
+
+import swarms.structs.x402_payment_agent as x402_agent
+from swarms.structs.x402_payment_agent import StepResult, X402PaymentAgent
+
+FACILITATOR = "http://facilitator.test"
+
+
+@pytest.fixture(autouse=True)
+def fresh_module_caches(monkeypatch):
+    monkeypatch.setattr(x402_agent, "_BATCH_UNSUPPORTED", {})
+    monkeypatch.setattr(x402_agent, "_FACILITATOR_CACHE", {})
+
+
+@pytest.fixture(autouse=True)
+def keep_expected_errors_out_of_the_workspace_log(monkeypatch):
+    # swarms' root logging handler appends ERROR records to agent_workspace/error.txt
+    monkeypatch.setattr(x402_agent.logger, "propagate", False)
+
+
+def make_agent(handler, **kwargs):
+    agent = X402PaymentAgent(facilitator_url=FACILITATOR, **kwargs)
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    # the reachability probe is covered separately; keep these tests on the facilitator under test
+    agent._facilitator_checked = True
+    return agent
+
+
+def step_handler(calls, batch_response=None, batch_error=None):
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path == "/batch":
+            if batch_error is not None:
+                raise batch_error
+            return batch_response
+        return httpx.Response(200, json={"step": request.url.path})
+
+    return handler
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 422, 500])
+def test_rejected_batch_falls_back_to_steps_and_is_remembered(status):
+    calls = []
+    agent = make_agent(step_handler(calls, batch_response=httpx.Response(status, json={"error": "nope"})))
+
+    result = agent.complete_payment_flow(1.0, memo="a")
+
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+    assert result["settle"]["status_code"] == 200
+    calls.clear()
+    agent.complete_payment_flow(1.0, memo="b")
+    assert calls == ["/create_payment", "/verify", "/settle"]
+
+
+def test_batch_used_when_supported():
+    calls = []
+    results = {"results": [{"status_code": 201, "payload": {"i": i}} for i in range(3)]}
+    agent = make_agent(step_handler(calls, batch_response=httpx.Response(200, json=results)))
+
+    result = agent.complete_payment_flow(1.0, memo="a")
+
+    assert calls == ["/batch"]
+    assert result["settle"] == {"status_code": 201, "payload": {"i": 2}}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"unexpected": True},
+        {"results": [{"status_code": 200}]},
+        {"results": [{"payload": {}}, {"payload": {}}, {"payload": {}}]},
+        "<html>ok</html>",
+    ],
+)
+def test_reply_without_batch_shape_falls_back_to_steps(body):
+    # e.g. a catch-all route answering 200 for unknown paths
+    calls = []
+    response = httpx.Response(200, json=body) if isinstance(body, dict) else httpx.Response(200, text=body)
+    agent = make_agent(step_handler(calls, batch_response=response))
+
+    result = agent.complete_payment_flow(1.0, memo="a")
+
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+    assert result["settle"]["payload"] == {"step": "/settle"}
+    calls.clear()
+    agent.complete_payment_flow(1.0, memo="b")
+    assert calls == ["/create_payment", "/verify", "/settle"]
+
+
+def test_batch_is_retried_once_the_rejection_expires(monkeypatch):
+    calls = []
+    agent = make_agent(step_handler(calls, batch_response=httpx.Response(503)))
+    agent.complete_payment_flow(1.0, memo="a")
+    assert FACILITATOR in x402_agent._BATCH_UNSUPPORTED
+
+    monkeypatch.setitem(x402_agent._BATCH_UNSUPPORTED, FACILITATOR, time.monotonic() - 1)
+    calls.clear()
+    agent.complete_payment_flow(1.0, memo="b")
+
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+
+
+def test_connect_error_falls_back_to_steps():
+    calls = []
+    agent = make_agent(step_handler(calls, batch_error=httpx.ConnectError("refused")))
+
+    result = agent.complete_payment_flow(1.0, memo="a")
+
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+    assert result["settle"]["status_code"] == 200
+
+
+def test_read_timeout_does_not_replay_payment():
+    calls = []
+    agent = make_agent(step_handler(calls, batch_error=httpx.ReadTimeout("slow")))
+
+    result = agent.complete_payment_flow(1.0, memo="a")
+
+    assert calls == ["/batch"]
+    assert result["settle"]["status_code"] == 0
+    assert "slow" in result["settle"]["error"]
+
+
+def test_request_body_returned_to_caller_does_not_leak_into_later_requests():
+    sent = []
+
+    def handler(request):
+        sent.append(json.loads(request.content)["amount"])
+        return httpx.Response(400, json={"error": "bad"})
+
+    agent = make_agent(handler)
+    first = agent.paid_api_call("verify", 1.0)
+    first["request_body"]["amount"] = 5.0
+
+    agent.paid_api_call("verify", 5.0)
+    agent.paid_api_call("verify", 1.0)
+
+    assert sent == [1.0, 5.0, 1.0]
+
+
+def test_large_integers_in_facilitator_replies_stay_exact():
+    agent = make_agent(lambda request: httpx.Response(200, content=b'{"value":18446744073709551617}', headers={"content-type": "application/json"}))
+
+    result = agent.paid_api_call("verify", 1.0)
+
+    assert result["payload"] == {"value": 18446744073709551617}
+
+
+MOCK_FACILITATOR = "http://mock.test"
+
+
+def outage_handler(calls):
+    # the configured facilitator is down; the local mock answers everything
+    def handler(request):
+        calls.append((request.url.host, request.url.path))
+        if request.url.host == "facilitator.test":
+            return httpx.Response(503)
+        if request.url.path == "/batch":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"step": request.url.path})
+
+    return handler
+
+
+def fresh_agent(handler, monkeypatch):
+    monkeypatch.setenv("MOCK_FACILITATOR_URL", MOCK_FACILITATOR)
+    agent = X402PaymentAgent(facilitator_url=FACILITATOR)
+
+    # a slow /list widens the window in which concurrent first callers could skip the probe
+    def slow_list(request):
+        if request.url.path == "/list":
+            time.sleep(0.05)
+        return handler(request)
+
+    async def aslow_list(request):
+        if request.url.path == "/list":
+            await asyncio.sleep(0.05)
+        return handler(request)
+
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(slow_list))
+    agent._new_async_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(aslow_list))
+    return agent
+
+
+def test_facilitator_probe_waits_for_first_use(monkeypatch):
+    calls = []
+    agent = fresh_agent(outage_handler(calls), monkeypatch)
+    assert calls == []
+
+    agent.paid_api_call("verify", 1.0)
+
+    assert calls[:2] == [("facilitator.test", "/list"), ("mock.test", "/list")]
+    assert calls[2:] == [("mock.test", "/verify")]
+
+
+def assert_flows_ran_on_the_mock(results, calls):
+    assert [result["settle"]["status_code"] for result in results] == [200, 200]
+    assert [path for host, path in calls if host == "facilitator.test"] == ["/list"]
+    assert FACILITATOR not in x402_agent._BATCH_UNSUPPORTED
+
+
+def test_concurrent_first_flows_share_one_probe(monkeypatch):
+    calls = []
+    agent = fresh_agent(outage_handler(calls), monkeypatch)
+    results = [None, None]
+
+    def run(i):
+        results[i] = agent.complete_payment_flow(float(i + 1), memo=str(i))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert_flows_ran_on_the_mock(results, calls)
+
+
+def test_concurrent_first_async_flows_share_one_probe(monkeypatch):
+    calls = []
+    agent = fresh_agent(outage_handler(calls), monkeypatch)
+
+    async def main():
+        return await asyncio.gather(agent.acomplete_payment_flow(1.0, memo="a"), agent.acomplete_payment_flow(2.0, memo="b"))
+
+    assert_flows_ran_on_the_mock(asyncio.run(main()), calls)
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("content-length", 0)))
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_async_calls_work_across_event_loops(keep_alive_server):
+    agent = X402PaymentAgent(facilitator_url=keep_alive_server)
+    agent._facilitator_checked = True
+    clients = []
+    new_client = agent._new_async_client
+    agent._new_async_client = lambda: clients.append(new_client()) or clients[-1]
+
+    first = asyncio.run(agent.apaid_api_call("verify", 1.0))
+    # a pooled connection from the first (now closed) loop must not be reused here
+    second = asyncio.run(agent.apaid_api_call("verify", 1.0))
+
+    assert first["status_code"] == 200
+    assert second["status_code"] == 200
+    # each call's client (and its pool) is closed before its loop ends
+    assert len(clients) == 2 and all(client.is_closed for client in clients)
+
+
+def test_async_flow_uses_one_client_for_all_its_requests():
+    calls = []
+    clients = []
+    handler = step_handler(calls, batch_response=httpx.Response(404))
+    agent = make_agent(handler)
+    agent._new_async_client = lambda: clients.append(httpx.AsyncClient(transport=httpx.MockTransport(handler))) or clients[-1]
+
+    result = asyncio.run(agent.acomplete_payment_flow(1.0, memo="a"))
+
+    assert result["settle"]["status_code"] == 200
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+    assert len(clients) == 1 and clients[0].is_closed
+
+
+def test_repeated_flows_pay_again_by_default():
+    calls = []
+    agent = make_agent(step_handler(calls, batch_response=httpx.Response(404)))
+
+    agent.complete_payment_flow(1.0, memo="m")
+    agent.complete_payment_flow(1.0, memo="m")
+
+    assert calls.count("/settle") == 2
+
+
+def test_flow_cache_returns_copies_and_is_scoped_to_wallet_network_and_facilitator():
+    calls = []
+    agent = make_agent(step_handler(calls, batch_response=httpx.Response(404)), cache_ttl=5.0)
+
+    first = agent.complete_payment_flow(1.0, memo="m")
+    first["settle"]["payload"]["step"] = "tampered"
+    again = agent.complete_payment_flow(1.0, memo="m")
+    assert again["settle"]["payload"] == {"step": "/settle"}
+    assert calls == ["/batch", "/create_payment", "/verify", "/settle"]
+
+    for change in ({"wallet_address": "0xother"}, {"network": "base"}, {"facilitator_url": "http://other.test"}):
+        calls.clear()
+        for name, value in change.items():
+            setattr(agent, name, value)
+        agent.complete_payment_flow(1.0, memo="m")
+        assert "/settle" in calls, change
+
+
+def list_handler(calls, responses):
+    def handler(request):
+        calls.append(request.url.path)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    return handler
+
+
+def test_facilitator_cache_expires_and_can_be_invalidated(monkeypatch):
+    calls = []
+    agent = make_agent(list_handler(calls, [httpx.Response(200, json={})]))
+
+    agent.discover_facilitator()
+    agent.discover_facilitator()
+    assert calls == ["/list"]
+
+    X402PaymentAgent.invalidate_facilitator_cache(FACILITATOR + "/")
+    agent.discover_facilitator()
+    assert calls == ["/list", "/list"]
+
+    X402PaymentAgent.invalidate_facilitator_cache()
+    agent.discover_facilitator()
+    assert len(calls) == 3
+
+    monkeypatch.setattr(x402_agent, "_FACILITATOR_CACHE_TTL", 0.0)
+    agent.discover_facilitator()
+    assert len(calls) == 4
+
+
+def test_facilitator_outage_serves_stale_response(monkeypatch):
+    calls = []
+    agent = make_agent(list_handler(calls, [httpx.Response(200, json={"networks": ["base"]}), httpx.Response(503)]))
+    agent.discover_facilitator()
+    monkeypatch.setattr(x402_agent, "_FACILITATOR_CACHE_TTL", 0.0)
+
+    info = agent.discover_facilitator()
+
+    assert info["stale"] is True
+    assert info["payload"] == {"networks": ["base"]}
+    # a stale answer still counts as reachable, so the agent does not switch to the mock facilitator
+    agent._facilitator_checked = False
+    agent._ensure_facilitator()
+    assert agent.facilitator_url == FACILITATOR
+
+
+def test_facilitator_client_error_is_not_replaced_by_stale_response(monkeypatch):
+    calls = []
+    agent = make_agent(list_handler(calls, [httpx.Response(200, json={}), httpx.Response(404)]))
+    agent.discover_facilitator()
+    monkeypatch.setattr(x402_agent, "_FACILITATOR_CACHE_TTL", 0.0)
+
+    info = agent.discover_facilitator()
+
+    assert info["status_code"] == 404
+    assert "stale" not in info
+
+
+KEY_A = "0x" + "11" * 32
+KEY_B = "0x" + "22" * 32
+
+
+@pytest.fixture
+def sign_calls(monkeypatch):
+    calls = []
+    original = X402PaymentAgent._sign_eip712
+
+    def counting(self, structured_data):
+        calls.append(structured_data["message"]["memo"])
+        return original(self, structured_data)
+
+    monkeypatch.setattr(X402PaymentAgent, "_sign_eip712", counting)
+    return calls
+
+
+def test_signature_cache_reuses_identical_intents(sign_calls):
+    pytest.importorskip("eth_account")
+    agent = make_agent(step_handler([]), wallet_private_key=KEY_A)
+
+    _, first = agent._sign_intent_cached(1.0, memo="a")
+    _, again = agent._sign_intent_cached(1.0, memo="a")
+    _, other = agent._sign_intent_cached(1.0, memo="b")
+
+    assert first is not None and first == again
+    assert other != first
+    assert sign_calls == ["a", "b"]
+
+
+def test_signature_cache_resets_when_wallet_changes(sign_calls):
+    pytest.importorskip("eth_account")
+    agent = make_agent(step_handler([]), wallet_private_key=KEY_A)
+    _, first = agent._sign_intent_cached(1.0, memo="a")
+
+    agent.wallet_private_key = KEY_B
+    agent.init_wallet()
+    _, second = agent._sign_intent_cached(1.0, memo="a")
+
+    assert sign_calls == ["a", "a"]
+    assert second != first
+
+
+
+
+def test_payment_intents_are_encoded_once_and_sign_like_full_eip712_encoding():
+    eth_account = pytest.importorskip("eth_account")
+    from eth_account.messages import encode_typed_data
+
+    x402_agent._encode_payment_intent.cache_clear()
+    first = make_agent(step_handler([]), wallet_private_key=KEY_A)
+    second = make_agent(step_handler([]), wallet_private_key=KEY_A)
+    structured = first._build_eip712_intent(1.0, memo="a")
+
+    signature = first._sign_eip712(structured)
+    again = second._sign_eip712(first._build_eip712_intent(1.0, memo="a"))
+
+    info = x402_agent._encode_payment_intent.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
+    expected = eth_account.Account.sign_message(encode_typed_data(full_message=structured), KEY_A).signature.hex()
+    assert signature == again == expected
+
+def test_eth_account_is_imported_on_first_wallet_use(tmp_path):
+    # a fresh interpreter, since this test session has long since imported eth_account; run from
+    # tmp_path so swarms' workspace log lands there
+    code = (
+        "import sys\n"
+        "import swarms.structs.x402_payment_agent, swarms.tools.x402_payment_tool\n"
+        "from swarms.utils import x402_http\n"
+        "print('eth_account' in sys.modules)\n"
+        "x402_http.get_account()\n"
+        "print('eth_account' in sys.modules)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[2]), LITELLM_LOCAL_MODEL_COST_MAP="True")
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=300)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["False", "True"]
+
+def test_step_result_to_dict_omits_unset_fields():
+    assert StepResult().to_dict() == {"status_code": 0}
+    assert StepResult(error="boom").to_dict() == {"status_code": 0, "error": "boom"}
+
+    step = StepResult(status_code=200, payload={"id": "p1"}, headers={})
+    step.add_diagnostics(attempt=1)
+    step.add_diagnostics(fallback="signed")
+    assert step.to_dict() == {
+        "status_code": 200,
+        "payload": {"id": "p1"},
+        "headers": {},
+        "diagnostics": {"attempt": 1, "fallback": "signed"},
+    }
+
+
+def test_facilitator_probe_is_shared_between_agents():
+    calls = []
+    ok = httpx.Response(200, json={"networks": ["base"]})
+    first = make_agent(list_handler(calls, [ok]))
+    second = make_agent(list_handler(calls, [ok]))
+
+    assert first.discover_facilitator()["payload"] == {"networks": ["base"]}
+    assert second.discover_facilitator()["payload"] == {"networks": ["base"]}
+    assert calls == ["/list"]
+
+
+
+def test_facilitator_info_is_copied_out_of_the_shared_cache():
+    calls = []
+    ok = httpx.Response(200, json={"networks": ["base"]})
+    first = make_agent(list_handler(calls, [ok]))
+    second = make_agent(list_handler(calls, [ok]))
+
+    first.discover_facilitator()["payload"]["networks"].append("mutated")
+    second.discover_facilitator()["payload"]["networks"].append("mutated")
+
+    assert first.discover_facilitator()["payload"] == {"networks": ["base"]}
+    assert calls == ["/list"]
+
+
+def test_failed_step_reports_a_copy_of_the_facilitator_info():
+    def handler(request):
+        if request.url.path == "/list":
+            return httpx.Response(200, json={"networks": ["base"]})
+        return httpx.Response(402, json={})
+
+    agent = make_agent(handler)
+
+    result = agent.paid_api_call("verify", 1.0)
+    result["facilitator_info"]["payload"]["networks"].clear()
+
+    assert agent.discover_facilitator()["payload"] == {"networks": ["base"]}
+
+def test_facilitator_cache_override_isolates_context():
+    calls = []
+    agent = make_agent(list_handler(calls, [httpx.Response(200, json={})]))
+    agent.discover_facilitator()
+
+    def isolated():
+        x402_agent._FACILITATOR_CACHE_OVERRIDE.set({})
+        agent.discover_facilitator()
+        agent.discover_facilitator()
+
+    contextvars.copy_context().run(isolated)
+
+    assert calls == ["/list", "/list"]
+    assert FACILITATOR in x402_agent._FACILITATOR_CACHE
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+import x402.clients.base as x402_base
+import x402.clients.requests as x402_requests_module
+from x402.clients.base import decode_x_payment_response, x402Client
+from x402.clients.requests import x402_async_requests, x402_requests
+
+
+def login_handler(request):
+    if request.url.path.startswith("/login/"):
+        user = request.url.path.rsplit("/", 1)[1]
+        return httpx.Response(200, headers={"set-cookie": f"session={user}; Path=/"})
+    if request.url.path == "/old":
+        return httpx.Response(302, headers={"location": "/new"})
+    return httpx.Response(200, json={"path": request.url.path, "cookie": request.headers.get("cookie")})
+
+
+@pytest.fixture
+def mock_transport(monkeypatch):
+    transport = httpx.MockTransport(login_handler)
+    monkeypatch.setattr(x402_requests_module, "_TRANSPORT", transport)
+    monkeypatch.setattr(x402_requests_module, "_acquire_async_transport", lambda: transport)
+    return transport
+
+
+def test_sessions_share_the_pool_but_not_cookies(mock_transport):
+    alice, bob = x402_requests(account=None), x402_requests(account=None)
+    alice.get("http://api.test/login/alice")
+
+    assert alice.get("http://api.test/me").json()["cookie"] == "session=alice"
+    assert bob.get("http://api.test/me").json()["cookie"] is None
+    assert alice._client._transport is bob._client._transport is mock_transport
+
+
+def test_session_follows_redirects(mock_transport):
+    res = x402_requests(account=None).get("http://api.test/old")
+
+    assert res.status_code == 200
+    assert res.json()["path"] == "/new"
+
+
+def test_async_sessions_keep_separate_cookies_and_follow_redirects(mock_transport):
+    async def main():
+        async with x402_async_requests(account=None) as alice, x402_async_requests(account=None) as bob:
+            await alice.get("http://api.test/login/alice")
+            mine, theirs, redirected = await asyncio.gather(
+                alice.get("http://api.test/me"), bob.get("http://api.test/me"), bob.get("http://api.test/old")
+            )
+            return mine.json(), theirs.json(), redirected.json()
+
+    mine, theirs, redirected = asyncio.run(main())
+
+    assert mine["cookie"] == "session=alice"
+    assert theirs["cookie"] is None
+    assert redirected["path"] == "/new"
+
+
+def test_async_pool_is_closed_with_the_last_session_on_its_loop(monkeypatch):
+    closed = []
+
+    class ClosingTransport(httpx.MockTransport):
+        async def aclose(self):
+            closed.append(self)
+
+    monkeypatch.setattr(x402_requests_module.httpx, "AsyncHTTPTransport", lambda **kwargs: ClosingTransport(login_handler))
+
+    async def main():
+        async with x402_async_requests(account=None) as alice:
+            async with x402_async_requests(account=None) as bob:
+                await alice.get("http://api.test/me")
+                await bob.get("http://api.test/me")
+            # alice still holds the pool
+            holders = [pool[1] for pool in x402_requests_module._ASYNC_POOLS.values()]
+        return holders, dict(x402_requests_module._ASYNC_POOLS)
+
+    for run in range(1, 3):
+        holders, pools = asyncio.run(main())
+        assert holders == [1]
+        assert pools == {}
+        assert len(closed) == run
+
+
+@pytest.fixture
+def loads_spy(monkeypatch):
+    parsed = []
+
+    loads = x402_base.json.loads
+
+    def spy(value, *args, **kwargs):
+        parsed.append(value)
+        return loads(value, *args, **kwargs)
+
+    monkeypatch.setattr(x402_base.json, "loads", spy)
+    return parsed
+
+
+@pytest.mark.parametrize("value", ["tx_12345", "0xabc123", "0X1f", b"tx_1", b"0xabc123", " tx_1", "nonce-1", "false_alarm"])
+def test_bare_ids_skip_the_json_parser(loads_spy, value):
+    expected = value.decode() if isinstance(value, bytes) else value
+
+    assert decode_x_payment_response(value) == {"transaction": expected}
+    assert loads_spy == []
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [('{"transaction": "tx_1"}', {"transaction": "tx_1"}), (b" [1, 2] ", [1, 2]), ("true", True), (b"null", None), ("42", 42), ("-1", -1)],
+)
+def test_json_values_are_parsed(loads_spy, value, expected):
+    assert decode_x_payment_response(value) == expected
+    assert loads_spy == [value]
+
+
+@pytest.mark.parametrize("value", ['{"amount":1000000000000000000001}', b'{"amount":1000000000000000000001}'])
+def test_large_settlement_amounts_stay_exact(value):
+    assert decode_x_payment_response(value) == {"amount": 1000000000000000000001}
+
+
+def test_selector_sees_in_place_changes_to_accepts():
+    select = x402Client.default_payment_requirements_selector
+    accepts = [{"network": "a"}, {"network": "b"}]
+
+    assert select(accepts, "b") is accepts[1]
+    accepts[1] = {"network": "c"}
+    assert select(accepts, "b") is accepts[0]
+    assert select(accepts, "c") is accepts[1]
+
+
+def test_selector_tolerates_unhashable_networks():
+    accepts = [{"network": ["a", "b"]}, "junk", {"network": "b"}]
+
+    assert x402Client.default_payment_requirements_selector(accepts, "b") is accepts[2]
+    assert x402Client.default_payment_requirements_selector(accepts) is accepts[0]
+
+
+def test_importing_the_requests_client_leaves_eth_account_unloaded():
+    # a fresh interpreter, since this test session may already have imported eth_account
+    code = "import sys\nimport x402.clients.requests\nprint('eth_account' in sys.modules)\n"
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1]))
+    result = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
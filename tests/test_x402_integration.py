@@ -1,34 +1,43 @@
-import importlib.util
+import json
+import os
+import subprocess
 import sys
+from pathlib import Path
+
+import httpx
 from httpx import Response
 from httpx import Request
 import pytest
 
-spec = importlib.util.spec_from_file_location("x402_tool", r"D:\Projects\swarms\swarms\tools\x402_payment_tool.py")
-module = importlib.util.module_from_spec(spec)
-spec.loader.exec_module(module)
-x402_payment_tool = module.x402_payment_tool
+import swarms.tools.x402_payment_tool as module
+from swarms.tools.x402_payment_tool import x402_payment_tool
+
+# canned facilitator reply, encoded once and shared by every fake response
+_CANNED_JSON = b'{"id":"tx_12345","status":"success"}'
+_CANNED_HEADERS = [(b"x-payment-response", b"tx_12345"), (b"content-type", b"application/json")]
 
 
 class DummyTransport:
     def __init__(self, status_code=200, json_body=None, headers=None):
         self.status_code = status_code
-        self.json_body = json_body or {"id": "tx_12345", "status": "success"}
-        self.headers = headers or {"X-PAYMENT-RESPONSE": "tx_12345"}
+        self.json_body = json_body
+        self.headers = headers or _CANNED_HEADERS
 
     def request(self, method, url, headers=None, json=None):
+        if self.json_body is None:
+            return Response(status_code=self.status_code, content=_CANNED_JSON, headers=self.headers, request=Request(method=method, url=url))
         return Response(status_code=self.status_code, json=self.json_body, headers=self.headers, request=Request(method=method, url=url))
 
 
 def test_x402_payment_tool_success(monkeypatch):
     def fake_post(url, json=None, headers=None):
-        return Response(status_code=200, json={"id": "tx_12345", "status": "success"}, headers={"X-PAYMENT-RESPONSE": "tx_12345"}, request=Request(method="POST", url=url))
+        return Response(status_code=200, content=_CANNED_JSON, headers=_CANNED_HEADERS, request=Request(method="POST", url=url))
 
     class FakeClient:
         def __init__(self, *args, **kwargs):
             pass
 
-        def post(self, url, json=None, headers=None):
+        def post(self, url, json=None, content=None, headers=None):
             return fake_post(url, json=json, headers=headers)
 
         def __enter__(self):
@@ -38,13 +47,52 @@ def test_x402_payment_tool_success(monkeypatch):
             return False
 
     monkeypatch.setattr("httpx.Client", FakeClient)
+    monkeypatch.setattr(module, "_CLIENT", None)
 
     res = x402_payment_tool(amount=0.01, currency="USD", memo="unit-test-payment", facilitator_url="https://facilitator.payai.network")
 
     assert res["status_code"] == 200
     assert res["body"]["status"] == "success"
-    assert any(k.lower() == "x-payment-response" for k in res["headers"].keys())
+    assert "x-payment-response" in res["headers"]
+
+
+def test_x402_payment_tool_encodes_amounts_beyond_64_bits(monkeypatch):
+    sent = []
+
+    def handler(request):
+        if request.url.path == "/list":
+            return Response(status_code=200, json={})
+        sent.append(json.loads(request.content))
+        return Response(status_code=200, content=_CANNED_JSON, headers=_CANNED_HEADERS)
+
+    monkeypatch.setattr(module, "_CLIENT", httpx.Client(transport=httpx.MockTransport(handler)))
+
+    res = x402_payment_tool(amount=10**21, currency="wei", facilitator_url="https://facilitator.test")
+
+    assert res["status_code"] == 200
+    assert sent == [{"amount": 10**21, "currency": "wei"}]
+
+
+
+def test_default_facilitator_is_resolved_from_env_at_import(tmp_path):
+    # a fresh interpreter, so the module-level defaults are computed under this environment
+    code = (
+        "import os\n"
+        "import httpx\n"
+        "import swarms.tools.x402_payment_tool as tool\n"
+        "os.environ['FACILITATOR_URL'] = 'https://changed.test'\n"
+        "seen = []\n"
+        "tool._CLIENT = httpx.Client(transport=httpx.MockTransport(lambda r: seen.append(str(r.url)) or httpx.Response(200, json={})))\n"
+        "tool.x402_payment_tool(amount=1)\n"
+        "print(*seen)\n"
+    )
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).resolve().parents[1]), LITELLM_LOCAL_MODEL_COST_MAP="True", FACILITATOR_URL="https://env.test/")
+    for name in ("X402_PRIVATE_KEY", "PAYAI_WALLET_PRIVATE_KEY", "X402_NETWORK"):
+        env.pop(name, None)
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=300)
 
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["https://env.test/list", "https://env.test/create_payment"]
 
 if __name__ == '__main__':
     pytest.main(["-q", __file__])
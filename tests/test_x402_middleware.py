@@ -0,0 +1,159 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from x402.facilitator import FacilitatorConfig
+from x402.fastapi.middleware import PaymentASGIMiddleware, PaymentMatcher, require_payment
+
+
+def _matcher():
+    return PaymentMatcher().add("/weather", "$0.001", "0xabc", "base-sepolia", FacilitatorConfig("http://facilitator"))
+
+
+def _app(*middleware):
+    app = FastAPI()
+
+    @app.get("/weather")
+    def weather():
+        return {"weather": "sunny"}
+
+    for cls, kwargs in middleware:
+        app.add_middleware(cls, **kwargs)
+    return app
+
+
+def test_asgi_middleware_behind_cors_does_not_leak_headers():
+    # added last, CORSMiddleware wraps the payment middleware and edits its response messages
+    app = _app(
+        (PaymentASGIMiddleware, {"matcher": _matcher()}),
+        (CORSMiddleware, {"allow_origins": ["http://a.com"]}),
+    )
+    client = TestClient(app)
+
+    for _ in range(3):
+        res = client.get("/weather", headers={"origin": "http://a.com"})
+        assert res.status_code == 402
+        assert res.headers["access-control-allow-origin"] == "http://a.com"
+        assert res.headers["vary"] == "Origin"
+
+    res = client.get("/weather", headers={"origin": "http://evil.com"})
+    assert res.status_code == 402
+    assert "access-control-allow-origin" not in res.headers
+
+
+def test_asgi_middleware_passes_paid_requests_through():
+    client = TestClient(_app((PaymentASGIMiddleware, {"matcher": _matcher()})))
+
+    res = client.get("/weather")
+    assert res.status_code == 402
+    assert res.headers["content-length"] == str(len(res.content))
+    assert res.json()["facilitator"] == "http://facilitator"
+    assert client.get("/weather", headers={"x-mock-payed": "true"}).json() == {"weather": "sunny"}
+
+
+def _function_middleware_app():
+    app = _app()
+    app.middleware("http")(_matcher().middleware)
+    return app
+
+
+def _require_payment_app(path):
+    app = _app()
+    app.middleware("http")(require_payment(path, "$0.001", "0xabc", "base-sepolia", FacilitatorConfig("http://facilitator")))
+    return app
+
+
+_INSTALLS = {
+    "asgi": lambda: _app((PaymentASGIMiddleware, {"matcher": _matcher()})),
+    "matcher": _function_middleware_app,
+    "require_payment": lambda: _require_payment_app("/weather"),
+}
+
+
+@pytest.mark.parametrize("install", sorted(_INSTALLS))
+@pytest.mark.parametrize("value", ["1", "true", "yes", "TRUE", "True", "TrUe", "YES"])
+def test_paid_header_spellings_are_accepted(install, value):
+    client = TestClient(_INSTALLS[install]())
+    assert client.get("/weather", headers={"X-Mock-Payed": value}).status_code == 200
+
+
+@pytest.mark.parametrize("install", sorted(_INSTALLS))
+@pytest.mark.parametrize("value", [None, "", "0", "false", "no", "paid"])
+def test_unpaid_header_values_get_402(install, value):
+    client = TestClient(_INSTALLS[install]())
+    headers = {} if value is None else {"X-Mock-Payed": value}
+    res = client.get("/weather", headers=headers)
+    assert res.status_code == 402
+    assert res.json()["error"] == "payment_required"
+
+
+def test_402_body_matches_json_response_encoding():
+    config = FacilitatorConfig("http://facilitator")
+    rule = PaymentMatcher().add("/weather", "€0.001", "0xabc", "base-sepolia", config).match("/weather")
+
+    expected = JSONResponse(
+        content={
+            "error": "payment_required",
+            "required_price": "€0.001",
+            "pay_to": "0xabc",
+            "network": "base-sepolia",
+            "facilitator": "http://facilitator",
+        }
+    ).body
+    assert rule.body == expected
+
+
+def test_require_payment_prefix_and_exact_paths():
+    prefix = TestClient(_require_payment_app("/*"))
+    assert prefix.get("/weather").status_code == 402
+
+    other = TestClient(_require_payment_app("/forecast/*"))
+    assert other.get("/weather").status_code == 200
+
+    exact = TestClient(_require_payment_app("/weather"))
+    assert exact.get("/weather").status_code == 402
+    assert exact.get("/weatherx").status_code == 404
+
+
+def _price(rule):
+    return json.loads(rule.body)["required_price"]
+
+
+def test_matcher_exact_and_prefix_routes():
+    config = FacilitatorConfig("http://facilitator")
+    matcher = PaymentMatcher().add("/weather", "1", "0xabc", "base", config).add("/api/*", "2", "0xabc", "base", config).add("/a.b", "3", "0xabc", "base", config)
+
+    assert _price(matcher.match("/weather")) == "1"
+    assert matcher.match("/weather/today") is None
+    assert matcher.match("/weatherx") is None
+    assert _price(matcher.match("/api/")) == "2"
+    assert _price(matcher.match("/api/v1/items")) == "2"
+    assert matcher.match("/api") is None
+    assert _price(matcher.match("/a.b")) == "3"
+    # patterns are literal paths, not regexes
+    assert matcher.match("/axb") is None
+    assert matcher.match("/other") is None
+
+
+def test_matcher_uses_registration_order_and_recompiles_on_add():
+    config = FacilitatorConfig("http://facilitator")
+    matcher = PaymentMatcher().add("/api/*", "prefix", "0xabc", "base", config)
+    assert matcher.match("/api/special") is not None
+
+    matcher.add("/api/special", "exact", "0xabc", "base", config).add("/paid", "late", "0xabc", "base", config)
+
+    assert _price(matcher.match("/api/special")) == "prefix"
+    assert _price(matcher.match("/paid")) == "late"
+
+
+def test_empty_matcher_protects_nothing():
+    matcher = PaymentMatcher()
+    assert matcher.match("/") is None
+    assert matcher.match("/weather") is None
+
+    client = TestClient(_app((PaymentASGIMiddleware, {"matcher": matcher})))
+    assert client.get("/weather").json() == {"weather": "sunny"}
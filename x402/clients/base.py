@@ -1,13 +1,59 @@
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Union
 
+# characters a JSON document can start with; anything else is a bare transaction id
+_JSON_START = frozenset('{["-0123456789tfn')
+_JSON_WHITESPACE = " \t\n\r"
+# ids like tx_12345 or 0xabc123 share a first character with JSON, so t/f/n only count as the full
+# literals and a leading 0x is never a number
+_JSON_LITERAL_START = frozenset("tfn")
+_JSON_LITERALS = frozenset(("true", "false", "null"))
+_HEX_PREFIXES = ("0x", "0X")
+# the same rules for raw header bytes
+_JSON_START_BYTES = frozenset(bytes([c]) for c in b'{["-0123456789tfn')
+_JSON_WHITESPACE_BYTES = b" \t\n\r"
+_JSON_LITERAL_START_BYTES = frozenset((b"t", b"f", b"n"))
+_JSON_LITERALS_BYTES = frozenset((b"true", b"false", b"null"))
+_HEX_PREFIXES_BYTES = (b"0x", b"0X")
 
-def decode_x_payment_response(header_value: str) -> Dict[str, Any]:
-    # simple decode: try JSON, otherwise return raw
+
+def _may_be_json(header_value: Union[str, bytes]) -> bool:
+    if isinstance(header_value, bytearray):
+        header_value = bytes(header_value)
+    if isinstance(header_value, bytes):
+        start, whitespace, literal_start, literals, hex_prefixes = (
+            _JSON_START_BYTES, _JSON_WHITESPACE_BYTES, _JSON_LITERAL_START_BYTES, _JSON_LITERALS_BYTES, _HEX_PREFIXES_BYTES
+        )
+    else:
+        start, whitespace, literal_start, literals, hex_prefixes = (
+            _JSON_START, _JSON_WHITESPACE, _JSON_LITERAL_START, _JSON_LITERALS, _HEX_PREFIXES
+        )
+    s = header_value.strip(whitespace)
+    first = s[:1]
+    if first not in start:
+        return False
+    if first in literal_start:
+        return s in literals
+    return not s.startswith(hex_prefixes)
+
+
+def _raw_transaction(header_value: Union[str, bytes]) -> Dict[str, Any]:
+    if isinstance(header_value, (bytes, bytearray)):
+        header_value = header_value.decode("ascii", errors="replace")
+    return {"transaction": header_value}
+
+
+def decode_x_payment_response(header_value: Union[str, bytes]) -> Dict[str, Any]:
+    # simple decode: try JSON, otherwise return raw. Bytes (e.g. straight from ASGI scope headers) are
+    # parsed as-is -- json.loads accepts them -- and only decoded for the raw fallback.
+    if not _may_be_json(header_value):
+        # skip the parser (and its exception) for the common bare-id case
+        return _raw_transaction(header_value)
     try:
+        # stdlib json, not orjson: settlement amounts can exceed 64 bits and must not come back as floats
         return json.loads(header_value)
-    except Exception:
-        return {"transaction": header_value}
+    except (ValueError, TypeError):
+        return _raw_transaction(header_value)
 
 
 class x402Client:
@@ -18,6 +64,7 @@ class x402Client:
             return None
         if network_filter is None:
             return accepts[0]
+        # a fresh accepts list arrives with each 402, so a scan that stops at the first match beats building an index
         for a in accepts:
             if isinstance(a, dict) and a.get("network") == network_filter:
                 return a
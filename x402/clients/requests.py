@@ -1,22 +1,201 @@
-from typing import Any, Callable, Dict, Optional
-import requests
-from eth_account import Account
+import asyncio
+import atexit
+import importlib.util
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+import httpx
 from .base import decode_x_payment_response, x402Client
 
+if TYPE_CHECKING:
+    # only needed for annotations; importing eth_account pulls in its whole crypto stack
+    from eth_account import Account
 
-class _SessionWithX402(requests.Session):
-    def __init__(self, account: Account, payment_requirements_selector: Optional[Callable] = None):
-        super().__init__()
+# Sessions are typically created per tool invocation, so they share one connection pool (transport);
+# otherwise every payment round trip to the facilitator would pay a fresh TCP+TLS handshake. Each
+# session still gets its own client, so cookies and default headers never cross sessions.
+_HTTP2 = importlib.util.find_spec("h2") is not None
+_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=100)
+_TIMEOUT = 10.0
+_TRANSPORT: Optional[httpx.HTTPTransport] = None
+_TRANSPORT_LOCK = threading.Lock()
+
+
+def _get_transport() -> httpx.HTTPTransport:
+    global _TRANSPORT
+    if _TRANSPORT is None:
+        with _TRANSPORT_LOCK:
+            if _TRANSPORT is None:
+                _TRANSPORT = httpx.HTTPTransport(http2=_HTTP2, limits=_LIMITS)
+    return _TRANSPORT
+
+
+@atexit.register
+def _close_transport() -> None:
+    global _TRANSPORT
+    if _TRANSPORT is not None:
+        try:
+            _TRANSPORT.close()
+        except Exception:
+            pass
+        _TRANSPORT = None
+
+
+# Async connections belong to the event loop that opened them, so async sessions share one pool per
+# loop: [transport, number of open sessions using it]. The last session closed on a loop closes its pool.
+_ASYNC_POOLS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List[Any]]" = weakref.WeakKeyDictionary()
+
+
+def _acquire_async_transport() -> httpx.AsyncHTTPTransport:
+    loop = asyncio.get_running_loop()
+    pool = _ASYNC_POOLS.get(loop)
+    if pool is None:
+        pool = _ASYNC_POOLS[loop] = [httpx.AsyncHTTPTransport(http2=_HTTP2, limits=_LIMITS), 0]
+    pool[1] += 1
+    return pool[0]
+
+
+async def _release_async_transport(transport: httpx.AsyncHTTPTransport) -> None:
+    loop = asyncio.get_running_loop()
+    pool = _ASYNC_POOLS.get(loop)
+    # already gone when `aclose_async_client` closed the pool first
+    if pool is None or pool[0] is not transport:
+        return
+    pool[1] -= 1
+    if pool[1] <= 0:
+        del _ASYNC_POOLS[loop]
+        await transport.aclose()
+
+
+async def aclose_async_client() -> None:
+    """Close the connection pool shared by async sessions on the running event loop, if one was created."""
+    pool = _ASYNC_POOLS.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool[0].aclose()
+
+
+class _X402SessionBase:
+    def __init__(self, account: "Account", payment_requirements_selector: Optional[Callable] = None):
         self.account = account
         self.payment_requirements_selector = payment_requirements_selector or x402Client.default_payment_requirements_selector
 
-    def request(self, method: str, url: str, **kwargs):
+
+class _SessionWithX402(_X402SessionBase):
+    """Session-style wrapper with its own httpx client (cookies, headers) on the shared connection pool."""
+
+    def __init__(self, account: "Account", payment_requirements_selector: Optional[Callable] = None):
+        super().__init__(account, payment_requirements_selector)
+        # follow redirects like requests.Session did
+        self._client = httpx.Client(transport=_get_transport(), timeout=_TIMEOUT, follow_redirects=True)
+        # resolve the client's bound method once instead of on every request
+        self._client_request = self._client.request
+
+    @property
+    def cookies(self) -> httpx.Cookies:
+        return self._client.cookies
+
+    @property
+    def headers(self) -> httpx.Headers:
+        return self._client.headers
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
         # For compatibility: do a normal request, and if the server returns a 402 with payment headers,
         # we could implement the x402 flow here. For now, just pass-through and return.
-        resp = super().request(method, url, **kwargs)
-        return resp
+        return self._client_request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PATCH", url, **kwargs)
 
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
 
-def x402_requests(account: Account, payment_requirements_selector: Optional[Callable] = None) -> _SessionWithX402:
+    def head(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    def options(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("OPTIONS", url, **kwargs)
+
+    def close(self) -> None:
+        # closing the client would close the shared transport; just drop this session's state
+        self._client.cookies.clear()
+
+    def __enter__(self) -> "_SessionWithX402":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class AsyncX402Session(_X402SessionBase):
+    """Async counterpart of `_SessionWithX402`; many requests can be in flight on one event loop.
+
+    Close the session (or use it as an async context manager) on the loop it ran on so that loop's
+    shared pool is released.
+    """
+
+    def __init__(self, account: "Account", payment_requirements_selector: Optional[Callable] = None):
+        super().__init__(account, payment_requirements_selector)
+        # one client per event loop the session is used on, each over (and holding) that loop's shared pool
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, httpx.AsyncHTTPTransport]]" = weakref.WeakKeyDictionary()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        entry = self._clients.get(loop)
+        if entry is None:
+            transport = _acquire_async_transport()
+            entry = self._clients[loop] = (httpx.AsyncClient(transport=transport, timeout=_TIMEOUT, follow_redirects=True), transport)
+        return entry[0]
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        # pass-through for now, like the sync session; the x402 402-retry flow would hook in here
+        return await self._get_client().request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    async def head(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def options(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("OPTIONS", url, **kwargs)
+
+    async def aclose(self) -> None:
+        # closing the client would close the shared pool; release this session's hold on it instead
+        entry = self._clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await _release_async_transport(entry[1])
+
+    async def __aenter__(self) -> "AsyncX402Session":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+
+def x402_requests(account: "Account", payment_requirements_selector: Optional[Callable] = None) -> _SessionWithX402:
     return _SessionWithX402(account=account, payment_requirements_selector=payment_requirements_selector)
 
+
+def x402_async_requests(account: "Account", payment_requirements_selector: Optional[Callable] = None) -> AsyncX402Session:
+    return AsyncX402Session(account=account, payment_requirements_selector=payment_requirements_selector)
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FacilitatorConfig:
     url: str
     timeout: Optional[int] = 10
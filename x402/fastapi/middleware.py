@@ -1,6 +1,60 @@
-from typing import Any, Callable, Dict, Optional
+import re
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+import orjson
 from fastapi import Request, Response
-from starlette.responses import JSONResponse
+
+# header names as ASGI delivers them (lowercase bytes), shared so lookups compare against one object
+_HDR_PAID_B = b"x-mock-payed"
+
+_PAID_VALUES = (b"1", b"true", b"yes")
+# common spellings of the paid header, checked before falling back to a lowercased comparison
+_PAID_FAST = frozenset((b"1", b"true", b"yes", b"True", b"TRUE", b"Yes", b"YES"))
+
+
+def _scope_header(scope: Dict[str, Any], name: bytes) -> Optional[bytes]:
+    # ASGI servers hand over lowercased (name, value) byte pairs; scanning them directly skips
+    # building starlette's Headers wrapper for every request
+    for key, value in scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _is_paid(scope: Dict[str, Any]) -> bool:
+    paid_header = _scope_header(scope, _HDR_PAID_B)
+    return paid_header is not None and (paid_header in _PAID_FAST or paid_header.lower() in _PAID_VALUES)
+
+
+class _PaymentRule:
+    """Paid-header check and 402 reply for one protected route; the caller has already matched the path."""
+
+    __slots__ = ("body", "headers")
+
+    def __init__(self, price: Any, pay_to_address: str, network: str, facilitator_config: Any):
+        # every field of the 402 body is fixed per route, so serialize it once up front; orjson's
+        # output is byte-identical to starlette's JSONResponse for these string fields
+        self.body = orjson.dumps({
+            "error": "payment_required",
+            "required_price": str(price),
+            "pay_to": pay_to_address,
+            "network": network,
+            "facilitator": getattr(facilitator_config, "url", None),
+        })
+        # header pairs for `PaymentASGIMiddleware`'s raw 402 reply, encoded once per route
+        self.headers = ((b"content-type", b"application/json"), (b"content-length", str(len(self.body)).encode("ascii")))
+
+    def start_message(self) -> Dict[str, Any]:
+        # a fresh dict and header list per request: outer middlewares (e.g. CORS) edit these in place
+        return {"type": "http.response.start", "status": 402, "headers": list(self.headers)}
+
+    def body_message(self) -> Dict[str, Any]:
+        return {"type": "http.response.body", "body": self.body}
+
+    async def __call__(self, request: Request, call_next: Callable):
+        if _is_paid(request.scope):
+            return await call_next(request)
+        return Response(content=self.body, status_code=402, media_type="application/json")
 
 
 def require_payment(path: str, price: Any, pay_to_address: str, network: str, facilitator_config: Any):
@@ -10,24 +64,85 @@ def require_payment(path: str, price: Any, pay_to_address: str, network: str, fa
     `X-MOCK-PAYED: true` to allow access. In production you'd call the facilitator to verify.
     """
 
-    def _match(request_path: str, pattern: str) -> bool:
-        if pattern.endswith("/*"):
-            return request_path.startswith(pattern[:-1])
-        return request_path == pattern
-
-    async def middleware(request: Request, call_next: Callable):
-        if _match(request.url.path, path):
-            paid_header = request.headers.get("x-mock-payed", "false").lower()
-            if paid_header in ("1", "true", "yes"):
-                return await call_next(request)
-            return JSONResponse(status_code=402, content={
-                "error": "payment_required",
-                "required_price": str(price),
-                "pay_to": pay_to_address,
-                "network": network,
-                "facilitator": getattr(facilitator_config, "url", None),
-            })
+    _enforce = _PaymentRule(price, pay_to_address, network, facilitator_config)
+
+    # the pattern is fixed per route, so pick a wildcard or exact middleware once; neither re-checks
+    # the pattern shape per request
+    _prefix = path[:-1]
+
+    async def _middleware_prefix(request: Request, call_next: Callable):
+        if request.scope["path"].startswith(_prefix):
+            return await _enforce(request, call_next)
         return await call_next(request)
 
-    return middleware
+    async def _middleware_exact(request: Request, call_next: Callable):
+        if request.scope["path"] == path:
+            return await _enforce(request, call_next)
+        return await call_next(request)
+
+    return _middleware_prefix if path.endswith("/*") else _middleware_exact
+
+
+class PaymentMatcher:
+    """Single middleware for many protected routes.
+
+    Instead of stacking one `require_payment` middleware per route (each request then walks every
+    closure), register the routes here and install `matcher.middleware` once. All patterns are
+    compiled into one anchored regex alternation, so dispatch is a single C-level match per request.
+    Routes are tried in registration order; `/prefix/*` patterns match any path under the prefix.
+    """
+
+    def __init__(self) -> None:
+        self._routes: List[Tuple[str, _PaymentRule]] = []
+        self._regex: Optional[Pattern[str]] = None
+
+    def add(self, path: str, price: Any, pay_to_address: str, network: str, facilitator_config: Any) -> "PaymentMatcher":
+        self._routes.append((path, _PaymentRule(price, pay_to_address, network, facilitator_config)))
+        self._regex = None
+        return self
+
+    def _compile(self) -> Pattern[str]:
+        alternatives = []
+        for i, (pattern, _) in enumerate(self._routes):
+            # match() anchors at the start; exact paths are also anchored at the end
+            body = re.escape(pattern[:-1]) if pattern.endswith("/*") else re.escape(pattern) + r"\Z"
+            alternatives.append(f"(?P<r{i}>{body})")
+        # an empty alternation would match every path, so use a pattern that never matches
+        self._regex = re.compile("|".join(alternatives) or r"(?!)")
+        return self._regex
+
+    def match(self, request_path: str) -> Optional[_PaymentRule]:
+        """Return the rule of the first route matching `request_path`, or None."""
+        regex = self._regex or self._compile()
+        m = regex.match(request_path)
+        if m is None:
+            return None
+        return self._routes[int(m.lastgroup[1:])][1]
+
+    async def middleware(self, request: Request, call_next: Callable):
+        enforce = self.match(request.scope["path"])
+        if enforce is None:
+            return await call_next(request)
+        return await enforce(request, call_next)
+
+
+class PaymentASGIMiddleware:
+    """Raw ASGI form of `PaymentMatcher.middleware`.
+
+    Unpaid requests to a protected route get that route's pre-encoded 402 reply written straight to
+    `send`, skipping starlette's Request/Response objects and the call_next machinery. Install with
+    `app.add_middleware(PaymentASGIMiddleware, matcher=matcher)`.
+    """
+
+    def __init__(self, app: Callable, matcher: PaymentMatcher):
+        self.app = app
+        self.matcher = matcher
 
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "http":
+            rule = self.matcher.match(scope["path"])
+            if rule is not None and not _is_paid(scope):
+                await send(rule.start_message())
+                await send(rule.body_message())
+                return
+        await self.app(scope, receive, send)
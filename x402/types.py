@@ -1,20 +1,20 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EIP712Domain:
     name: str
     version: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TokenAsset:
     address: str
     decimals: int = 18
     eip712: Optional[EIP712Domain] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TokenAmount:
     amount: str
     asset: TokenAsset